@@ -0,0 +1 @@
+"""Offline performance suite: ``python -m benchmarks.run --help``."""
@@ -0,0 +1,169 @@
+"""
+Benchmark cases.
+
+Each case is a ``setup()`` function registered with :func:`case`; it does the
+untimed preparation and returns the zero-argument callable that is timed.
+Names are ``group/what/params`` so ``--filter`` can pick groups by prefix.
+``quick`` cases are tiny and double as a smoke test.  Cases are set up and
+timed inside :func:`session`, which provides their scratch directory and
+keeps the on-disk cache off so no timing is a cache hit.
+"""
+from __future__ import annotations
+
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+
+from quantum_staircase import patterns
+from quantum_staircase.patterns import penrose
+from quantum_staircase.utils import cache, export, geometry, svg_export, validation
+from quantum_staircase.vendor.pynrose_core import PenroseTiling
+
+
+class Case(NamedTuple):
+    setup: Callable[[], Callable[[], object]]
+    quick: bool = False
+
+
+CASES: Dict[str, Case] = {}
+
+PANELS = [(0.5, 1.0), (1.0, 0.5), (3.0, 1.0)]   # (panel_size_m, resolution_mm)
+QUICK_PANEL = (0.2, 1.0)
+
+
+def case(name: str, quick: bool = False):
+    def register(setup):
+        if name in CASES:
+            raise ValueError(f"Duplicate benchmark {name!r}")
+        CASES[name] = Case(setup, quick)
+        return setup
+    return register
+
+
+def reset_caches():
+    """Forget memoised tilings so every repeat pays for its own work."""
+    penrose._cached_tiling.cache_clear()
+
+
+_scratch_dir: Optional[Path] = None
+
+
+@contextmanager
+def session():
+    """Temporary scratch directory, and no active on-disk cache, for the enclosed cases."""
+    global _scratch_dir
+    previous = cache.get_cache()
+    cache.set_cache(None)
+    try:
+        with tempfile.TemporaryDirectory(prefix="qs-bench-") as tmp:
+            _scratch_dir = Path(tmp)
+            yield _scratch_dir
+    finally:
+        _scratch_dir = None
+        if previous is not None:
+            cache.set_cache(previous.directory, previous.max_bytes)
+
+
+def _scratch(suffix):
+    if _scratch_dir is None:
+        raise RuntimeError("benchmark cases must be set up inside cases.session()")
+    return _scratch_dir / f"out{suffix}"
+
+
+# ----------------------------------------------------------------------
+# themes
+# ----------------------------------------------------------------------
+def _theme_case(theme, size, res):
+    def setup():
+        gen = patterns.get_theme(theme)
+        return lambda: np.asarray(gen(size, res))
+    return setup
+
+
+for _theme in patterns.list_themes():
+    for _size, _res in [QUICK_PANEL, *PANELS]:
+        case(f"theme/{_theme}/{_size:g}m@{_res:g}mm", quick=(_size, _res) == QUICK_PANEL)(
+            _theme_case(_theme, _size, _res))
+
+
+# ----------------------------------------------------------------------
+# Penrose pipeline
+# ----------------------------------------------------------------------
+def _level_cases(prefix, levels, quick_level, make):
+    for level in levels:
+        case(f"{prefix}/level{level}", quick=level == quick_level)(make(level))
+
+
+_level_cases("penrose/tiling", range(3, 9), 3,
+             lambda level: lambda: lambda: PenroseTiling(level).tile_array())
+_level_cases("penrose/merge", range(3, 7), 3,
+             lambda level: lambda: lambda: penrose._merged_polygons(level))
+
+
+def _validate_setup(level):
+    def setup():
+        polys = penrose._merged_polygons(level)
+        return lambda: validation.validate_polygons(polys, tol=1e-1)
+    return setup
+
+
+def _rasterize_setup(level):
+    def setup():
+        verts, _ = PenroseTiling(level).tile_array()
+        return lambda: penrose.rasterize(verts, 1.0, 1.0)
+    return setup
+
+
+def _qa_setup(level):
+    def setup():
+        verts, _ = PenroseTiling(level).tile_array()
+        return lambda: geometry.polygon_stats(verts)
+    return setup
+
+
+_level_cases("penrose/validate", range(3, 7), 3, _validate_setup)
+_level_cases("penrose/rasterize", range(3, 7), 3, _rasterize_setup)
+_level_cases("penrose/qa", (3, 9, 11), 3, _qa_setup)
+
+
+# ----------------------------------------------------------------------
+# exporters
+# ----------------------------------------------------------------------
+def _panel(px):
+    return patterns.get_theme("quantum_optics")(px / 1000, 1.0)
+
+
+def _save_image_setup(px, suffix, mode):
+    def setup():
+        arr, out = _panel(px), _scratch(suffix)
+        return lambda: export.save_image(arr, out, px / 1000, 1.0, mode=mode)
+    return setup
+
+
+def _save_svg_setup(px, raster):
+    def setup():
+        arr, out = _panel(px), _scratch(".svg")
+        return lambda: svg_export.save_svg(arr, out, px / 1000, 1.0, raster=raster)
+    return setup
+
+
+for _px in (200, 2000):
+    for _suffix, _mode in ((".png", "rgb8"), (".png", "gray8"), (".tif", "gray16")):
+        case(f"export/save_image/{_suffix[1:]}-{_mode}/{_px}px", quick=_px == 200)(
+            _save_image_setup(_px, _suffix, _mode))
+    for _raster in svg_export.RASTER_MODES:
+        case(f"export/save_svg/{_raster}/{_px}px", quick=_px == 200)(_save_svg_setup(_px, _raster))
+
+
+def _svg_polygons_setup(level):
+    def setup():
+        verts, thick = penrose.PenroseTiling(level).tile_array()
+        out = _scratch(".svgz")
+        return lambda: svg_export.save_svg(verts, out, 1.0, 1.0, values=thick * 0.5 + 0.5)
+    return setup
+
+
+_level_cases("export/save_svg/polygons", (3, 6, 9), 3, _svg_polygons_setup)
@@ -0,0 +1,216 @@
+"""
+Run the benchmark suite or compare two result files.
+
+    python -m benchmarks.run                      # full suite → benchmarks/results/
+    python -m benchmarks.run --quick -k theme/    # tiny cases whose name contains "theme/"
+    python -m benchmarks.run compare OLD.json NEW.json --threshold 0.15
+
+Every case runs in a fresh spawned interpreter, so peak RSS is its own:
+``peak_rss_mb`` is the growth of the process's maximum RSS over the timed
+calls, ``alloc_peak_mb`` the ``tracemalloc`` peak of one extra call (NumPy
+reports its buffers to tracemalloc).  Timings are wall-clock seconds of
+*repeat* calls after one warm-up; compare uses the minimum, the least noisy
+statistic.  Results are tagged with the machine they were measured on.
+
+``compare`` exits with status 1 if a case got slower (or used more memory)
+by more than *threshold*, so it can gate a release.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from queue import Empty
+
+RESULTS_DIR = Path(__file__).parent / "results"
+METRICS = ("min", "peak_rss_mb", "alloc_peak_mb")
+
+
+def _max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024   # bytes vs KiB
+
+
+def measure(name, repeat=5):
+    """Time case *name* in this process; returns its result record."""
+    from benchmarks import cases
+
+    with cases.session():
+        try:
+            fn = cases.CASES[name].setup()
+        except ImportError as exc:
+            return {"skipped": f"missing dependency: {exc.name or exc}"}
+        cases.reset_caches()
+        fn()                                     # warm-up (imports, first-touch pages)
+        rss0 = _max_rss_mb()
+        seconds = []
+        for _ in range(repeat):
+            cases.reset_caches()
+            t0 = time.perf_counter()
+            fn()
+            seconds.append(time.perf_counter() - t0)
+        rss = _max_rss_mb() - rss0
+        cases.reset_caches()
+        tracemalloc.start()
+        fn()
+        alloc = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "min": min(seconds),
+        "median": statistics.median(seconds),
+        "peak_rss_mb": rss,
+        "alloc_peak_mb": alloc / (1 << 20),
+    }
+
+
+def _child(name, repeat, queue):
+    try:
+        queue.put(measure(name, repeat))
+    except Exception as exc:   # report, keep the suite going
+        queue.put({"error": f"{type(exc).__name__}: {exc}"})
+
+
+def _isolated(name, repeat, poll=1.0):
+    """Result of :func:`measure` in a spawned child, or an error record if it dies first."""
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(name, repeat, queue))
+    proc.start()
+    try:
+        while proc.is_alive():
+            try:
+                return queue.get(timeout=poll)
+            except Empty:
+                pass
+        try:                                     # it may have reported just before exiting
+            return queue.get(timeout=poll)
+        except Empty:
+            return {"error": f"benchmark process died (exit code {proc.exitcode})"}
+    finally:
+        proc.join()
+
+
+def machine_tag():
+    import numpy
+
+    from quantum_staircase import __version__
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "system": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "quantum_staircase": __version__,
+        "commit": commit,
+    }
+
+
+def run(names, repeat=5, isolate=True, log=print):
+    results = {}
+    for name in names:
+        results[name] = _isolated(name, repeat) if isolate else measure(name, repeat)
+        r = results[name]
+        if "min" in r:
+            log(f"{name:55s} {r['min'] * 1e3:10.2f} ms  {r['peak_rss_mb']:8.1f} MB rss"
+                f"  {r['alloc_peak_mb']:8.1f} MB alloc")
+        else:
+            log(f"{name:55s} {r.get('skipped') or r.get('error')}")
+    return {
+        "machine": machine_tag(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=0.1, min_mb=1.0):
+    """``(rows, regressions)`` for cases present in both runs.
+
+    A metric regresses when ``new > old * (1 + threshold)``; memory metrics
+    must also grow by at least *min_mb* so allocator noise is ignored.
+    """
+    rows, regressions = [], []
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        a, b = old["results"][name], new["results"][name]
+        if "min" not in a or "min" not in b:
+            continue
+        for metric in METRICS:
+            before, after = a[metric], b[metric]
+            ratio = after / before if before > 0 else (1.0 if after <= 0 else float("inf"))
+            worse = after > before * (1 + threshold)
+            if metric != "min":
+                worse = worse and after - before >= min_mb
+            rows.append((name, metric, before, after, ratio, worse))
+            if worse:
+                regressions.append((name, metric))
+    return rows, regressions
+
+
+def _compare_main(args):
+    old, new = (json.loads(Path(p).read_text()) for p in (args.old, args.new))
+    if old["machine"].get("node") != new["machine"].get("node"):
+        print(f"warning: comparing {old['machine'].get('node')} against {new['machine'].get('node')}")
+    rows, regressions = compare(old, new, args.threshold)
+    for name, metric, before, after, ratio, worse in rows:
+        if worse or args.verbose:
+            print(f"{'REGRESSION' if worse else '':10s} {name:55s} {metric:14s} "
+                  f"{before:12.4g} → {after:12.4g}  ×{ratio:.2f}")
+    print(f"{len(regressions)} regression(s) past {args.threshold:.0%} in {len(rows)} comparisons")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["compare"]:
+        p = argparse.ArgumentParser(prog="benchmarks.run compare")
+        p.add_argument("old")
+        p.add_argument("new")
+        p.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown")
+        p.add_argument("-v", "--verbose", action="store_true", help="Show every comparison")
+        return _compare_main(p.parse_args(argv[1:]))
+
+    p = argparse.ArgumentParser(prog="benchmarks.run", description="Run the benchmark suite")
+    p.add_argument("-k", "--filter", default="", help="Only cases whose name contains this")
+    p.add_argument("--quick", action="store_true", help="Tiny cases only (smoke test)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--no-isolate", action="store_true", help="Run in-process (RSS is then shared)")
+    p.add_argument("--list", action="store_true", help="List matching cases and exit")
+    p.add_argument("-o", "--output", default=None, help="Result file (default: results/<node>-<time>.json)")
+    args = p.parse_args(argv)
+
+    from benchmarks import cases
+
+    names = [n for n, c in cases.CASES.items() if args.filter in n and (c.quick or not args.quick)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    report = run(names, args.repeat, isolate=not args.no_isolate)
+    out = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{report['machine']['node']}-{report['created'].replace(':', '')}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=1))
+    print(f"Saved {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
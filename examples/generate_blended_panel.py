@@ -17,6 +17,14 @@ multiple physics themes.
 • Size and resolution are independent:
       --width-m  3   --height-m 20 --resolution-mm 1
 
+• Each theme is rendered only over its own slice and blend bands
+  (:mod:`quantum_staircase.patterns.blend`); vertical morphs are streamed to
+  the output file segment by segment, optionally on several cores:
+      --workers 6
+  and encoded/compressed on background threads while the next segments
+  render:
+      --pipeline 2
+
 -------------------------------------------------------------------------------
 USAGE EXAMPLE  (vertical gradient for a 3×20 m wall)
 -------------------------------------------------------------------------------
@@ -33,83 +41,10 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
-from typing import List
-
-import numpy as np
 
 from quantum_staircase import patterns
-from quantum_staircase.utils import svg_export, export
-
-
-# ──────────────────────────────────────────────────────────────────────────────
-# core math helpers
-# ──────────────────────────────────────────────────────────────────────────────
-def _cos_blend(a: np.ndarray, b: np.ndarray, w: np.ndarray) -> np.ndarray:
-    """Cosine-smoothed blend between two arrays along the blending axis."""
-    weight = (1 - np.cos(np.pi * w)) / 2  # 0→1
-    return (1 - weight) * a + weight * b
-
-
-def _generate_theme_image(name: str, size_m: float, res_mm: float) -> np.ndarray:
-    """Call the theme’s generator at the requested physical resolution."""
-    gen = patterns.get_theme(name)
-    return gen(size_m, res_mm)
-
-
-# ──────────────────────────────────────────────────────────────────────────────
-# panel assembly
-# ──────────────────────────────────────────────────────────────────────────────
-def build_panel(
-    width_m: float,
-    height_m: float,
-    res_mm: float,
-    theme_names: List[str],
-    blend_frac: float,
-    axis: str = "y",
-) -> np.ndarray:
-    """
-    Return a NumPy image array with smooth transitions.
-
-    axis = 'y' → vertical morph; 'x' → horizontal.
-    """
-    px_w = int(width_m * 1000 / res_mm)
-    px_h = int(height_m * 1000 / res_mm)
-    n = len(theme_names)
-    slice_px = (px_h if axis == "y" else px_w) // n
-    blend_px = max(1, int(blend_frac * slice_px))
-
-    # Pre-render each theme over the *entire* canvas so colours match in blends
-    theme_img = {
-        t: _generate_theme_image(t, max(width_m, height_m), res_mm)[:px_h, :px_w]
-        for t in theme_names
-    }
-
-    panel = np.zeros((px_h, px_w))
-
-    # Paste core slices
-    for i, t in enumerate(theme_names):
-        if axis == "y":
-            y0, y1 = i * slice_px, (i + 1) * slice_px
-            panel[y0:y1, :] = theme_img[t][y0:y1, :]
-        else:
-            x0, x1 = i * slice_px, (i + 1) * slice_px
-            panel[:, x0:x1] = theme_img[t][:, x0:x1]
-
-    # Blend interfaces
-    for i in range(n - 1):
-        tA, tB = theme_names[i], theme_names[i + 1]
-        if axis == "y":
-            y_mid = (i + 1) * slice_px
-            y0, y1 = y_mid - blend_px, y_mid + blend_px
-            w = np.linspace(0, 1, y1 - y0)[:, None]
-            panel[y0:y1, :] = _cos_blend(theme_img[tA][y0:y1, :], theme_img[tB][y0:y1, :], w)
-        else:
-            x_mid = (i + 1) * slice_px
-            x0, x1 = x_mid - blend_px, x_mid + blend_px
-            w = np.linspace(0, 1, x1 - x0)
-            panel[:, x0:x1] = _cos_blend(theme_img[tA][:, x0:x1], theme_img[tB][:, x0:x1], w)
-
-    return np.clip(panel, 0, 1)
+from quantum_staircase.patterns import blend
+from quantum_staircase.utils import svg_export, export, raster_export
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -124,25 +59,35 @@ def main():
     p.add_argument("--blend-fraction", type=float, default=0.12, help="0–0.5")
     p.add_argument("--resolution-mm", type=float, default=1.0, help="Pixel pitch")
     p.add_argument("--outfile", required=True, help="PNG or SVG file")
+    p.add_argument("--workers", type=int, default=1, help="Cores to render on")
+    p.add_argument("--backend", choices=patterns.BACKENDS, default="process",
+                   help="Pool used with --workers > 1")
+    p.add_argument("--pipeline", type=int, default=0,
+                   help="Threads encoding streamed output while it renders (0: none)")
     args = p.parse_args()
 
-    wall = build_panel(
-        args.width_m,
-        args.height_m,
-        args.resolution_mm,
-        args.themes,
-        args.blend_fraction,
-        axis=args.axis,
-    )
-
+    spec = (args.width_m, args.height_m, args.resolution_mm, args.themes, args.blend_fraction)
     out_path = Path(args.outfile)
-    if out_path.suffix.lower() == ".svg":
+    suffix = out_path.suffix.lower()
+    opts = {}
+    if args.axis == "y" and (suffix in raster_export.SUFFIXES or suffix in (".svg", ".svgz")):
+        # row segments, last first: the panel is never held in memory
+        segments = blend.iter_segments(*spec, axis="y", workers=args.workers,
+                                       reverse=True, backend=args.backend)
+        wall = (pixels for _, pixels in segments)
+        opts["shape"] = blend.panel_shape(args.width_m, args.height_m, args.resolution_mm)
+        opts["pipeline"] = args.pipeline
+    else:
+        wall = blend.build_panel(*spec, axis=args.axis, workers=args.workers,
+                                  backend=args.backend)
+
+    if suffix in (".svg", ".svgz"):
         svg_export.save_svg(
-            wall, out_path, panel_size_m=args.width_m, resolution_mm=args.resolution_mm
+            wall, out_path, panel_size_m=args.width_m, resolution_mm=args.resolution_mm, **opts
         )
     else:
         export.save_image(
-            wall, out_path, size_m=args.width_m, res_mm=args.resolution_mm
+            wall, out_path, args.width_m, args.resolution_mm, **opts
         )
     print(f"Saved {out_path.resolve()}")
 
@@ -1,2 +1,3 @@
 """Quantum Staircase Tiling Generator"""
+__version__ = "0.1.0"
 __all__ = ["patterns", "utils"]
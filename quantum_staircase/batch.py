@@ -0,0 +1,304 @@
+"""
+Manifest-driven batch rendering with incremental rebuilds.
+
+    quantum-staircase batch staircase.toml [--jobs 4] [--pipeline 2] [--force] [--dry-run]
+
+The manifest lists panels; ``[defaults]`` fills in keys a panel omits::
+
+    [defaults]
+    resolution_mm = 1.0
+    output_dir = "renders"          # relative to the manifest
+
+    [[panel]]
+    name = "L1-east"
+    theme = "ligo"
+    size_m = 3.0                    # square; or width_m / height_m
+    output = "L1-east.png"          # .png/.tif/.svg/.svgz, or any matplotlib format
+
+    [[panel]]
+    name = "stairwell"
+    themes = ["ligo", "amo", "penrose"]   # blended along `axis`
+    width_m = 3.0
+    height_m = 12.0
+    blend_fraction = 0.12
+    output = "stairwell.tif"
+    mode = "gray16"
+
+Every panel is keyed on its parameters plus a hash of the code that renders
+it (its theme modules, the shared pattern/export machinery and the package
+version).  Keys of finished panels are kept in ``<manifest>.state.json``; a
+panel whose output exists under the same key is skipped, so editing one
+panel — or one theme — re-renders just the panels it affects, and an
+interrupted batch resumes where it stopped.  Stale panels render
+concurrently on ``--jobs`` processes, each to a temporary file that
+replaces the output only once complete; ``--pipeline N`` additionally
+overlaps each panel's rendering with encoding on *N* threads.  A job report
+is written to ``<manifest>.report.json``.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from quantum_staircase import __version__, patterns
+from quantum_staircase.patterns._registry import theme_module
+from quantum_staircase.patterns._window import DEFAULT_TILE_PX
+
+_SVG_SUFFIXES = (".svg", ".svgz")
+# pattern and export machinery every panel depends on (theme modules are added per panel)
+_CORE_SOURCES = ("patterns/_*.py", "patterns/blend.py", "utils/*.py", "vendor/**/*.py")
+
+
+class Panel(NamedTuple):
+    name: str
+    themes: Tuple[str, ...]
+    width_m: float
+    height_m: float
+    output: str
+    resolution_mm: float = 1.0
+    blend_fraction: float = 0.12
+    axis: str = "y"
+    mode: str = "rgb8"
+    cmap: str = "viridis"
+    dtype: str = "float64"
+    tile_px: int = DEFAULT_TILE_PX
+
+    def params(self):
+        """The rendering parameters (everything but the panel's name)."""
+        return {k: v for k, v in self._asdict().items() if k != "name"}
+
+
+_KEYS = set(Panel._fields) - {"themes", "width_m", "height_m"} | {"theme", "themes", "size_m",
+                                                                  "width_m", "height_m", "output_dir"}
+
+
+def _load_toml(path):
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError("Reading manifests needs Python 3.11+ or the 'tomli' package") from None
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def _panel(entry, base: Path, index: int) -> Panel:
+    unknown = set(entry) - _KEYS
+    if unknown:
+        raise ValueError(f"Panel {index}: unknown keys {sorted(unknown)}")
+    entry = dict(entry)
+    if ("theme" in entry) == ("themes" in entry):
+        raise ValueError(f"Panel {index}: give exactly one of 'theme' or 'themes'")
+    themes = (entry.pop("theme"),) if "theme" in entry else tuple(entry.pop("themes"))
+    unknown = set(themes) - set(patterns.list_themes())
+    if not themes or unknown:
+        raise ValueError(f"Panel {index}: unknown themes {sorted(unknown)}")
+    size = entry.pop("size_m", None)
+    width, height = entry.pop("width_m", size), entry.pop("height_m", size)
+    if width is None or height is None:
+        raise ValueError(f"Panel {index}: give size_m or both width_m and height_m")
+    if "output" not in entry:
+        raise ValueError(f"Panel {index}: missing 'output'")
+    out_dir = base / entry.pop("output_dir", ".")
+    output = str((out_dir / entry.pop("output")).resolve())
+    name = entry.pop("name", Path(output).stem)
+    return Panel(name, themes, float(width), float(height), output, **entry)
+
+
+def load_manifest(path) -> List[Panel]:
+    """Panels of the TOML manifest at *path*, with defaults applied and outputs resolved."""
+    path = Path(path)
+    manifest = _load_toml(path)
+    defaults = manifest.get("defaults", {})
+    panels = [_panel({**defaults, **entry}, path.parent, i)
+              for i, entry in enumerate(manifest.get("panel", []))]
+    outputs = [p.output for p in panels]
+    dup = {o for o in outputs if outputs.count(o) > 1}
+    if dup:
+        raise ValueError(f"Several panels write {sorted(dup)}")
+    return panels
+
+
+@lru_cache(maxsize=None)
+def code_version(themes: Tuple[str, ...]) -> str:
+    """Hash of the package version and of every source file rendering *themes*."""
+    root = Path(__file__).parent
+    files = {f for pattern in _CORE_SOURCES for f in root.glob(pattern)}
+    files.update(Path(theme_module(t).__file__) for t in themes)
+    h = hashlib.sha256(__version__.encode())
+    for f in sorted(files):
+        h.update(f.name.encode())
+        h.update(f.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def panel_key(panel: Panel) -> str:
+    params = json.dumps(panel.params(), sort_keys=True)
+    return hashlib.sha256(f"{params}|{code_version(panel.themes)}".encode()).hexdigest()[:32]
+
+
+def render_panel(panel: Panel, outfile=None, pipeline: int = 0):
+    """Render *panel* to *outfile* (its ``output`` by default), streaming where the format allows.
+
+    Streamed output is encoded on *pipeline* threads overlapping the render
+    (see :mod:`quantum_staircase.utils.pipeline`).  The pixels do not depend on
+    it, so it is not part of the panel's key.
+    """
+    from quantum_staircase.patterns import blend
+    from quantum_staircase.utils import export, raster_export, svg_export
+
+    outfile = Path(outfile or panel.output)
+    suffix = outfile.suffix.lower()
+    res, dtype = panel.resolution_mm, panel.dtype
+    if suffix in raster_export.SUFFIXES:
+        opts = {"mode": panel.mode, "cmap": panel.cmap, "rows_per_strip": panel.tile_px,
+                "pipeline": pipeline}
+    elif suffix in _SVG_SUFFIXES:
+        opts = {"cmap": panel.cmap, "tile_px": panel.tile_px, "pipeline": pipeline}
+    else:
+        opts = {}   # matplotlib: needs the whole array
+    streamed = bool(opts)
+
+    if len(panel.themes) == 1 and panel.width_m == panel.height_m:
+        px = patterns.panel_px(panel.width_m, res)
+        if streamed:
+            data = patterns.iter_strips(panel.themes[0], panel.width_m, res, rows=panel.tile_px,
+                                        reverse=True, dtype=dtype)
+            opts["shape"] = (px, px)
+        else:
+            data = patterns.get_theme(panel.themes[0])(panel.width_m, res, dtype=dtype)
+    else:
+        spec = (panel.width_m, panel.height_m, res, panel.themes, panel.blend_fraction)
+        if streamed and panel.axis == "y":
+            segments = blend.iter_segments(*spec, axis="y", reverse=True, dtype=dtype)
+            data = (pixels for _, pixels in segments)
+            opts["shape"] = blend.panel_shape(panel.width_m, panel.height_m, res)
+        else:
+            data = blend.build_panel(*spec, axis=panel.axis, dtype=dtype)
+    if suffix in _SVG_SUFFIXES:
+        svg_export.save_svg(data, outfile, panel.width_m, res, **opts)
+    else:
+        export.save_image(data, outfile, panel.width_m, res, **opts)
+    return outfile
+
+
+def _render_job(panel: Panel, pipeline: int = 0):
+    """Render into a temporary sibling and move it into place; returns seconds taken."""
+    out = Path(panel.output)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.stem}.partial{out.suffix}")
+    t0 = time.perf_counter()
+    try:
+        render_panel(panel, tmp, pipeline)
+        os.replace(tmp, out)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return time.perf_counter() - t0
+
+
+def _state_paths(manifest):
+    manifest = Path(manifest)
+    return manifest.with_suffix(".state.json"), manifest.with_suffix(".report.json")
+
+
+def _read_state(path: Path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: Path, obj):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(obj, indent=1))
+    os.replace(tmp, path)
+
+
+def run(manifest, jobs: int = 1, force: bool = False, dry_run: bool = False,
+        state_file: Optional[Path] = None, log=print, pipeline: int = 0):
+    """Bring every panel of *manifest* up to date; returns the job report.
+
+    Each report entry has the panel's ``name``, ``output``, ``key`` and
+    ``status``: ``"up-to-date"``, ``"stale"`` (dry run), ``"rendered"``
+    (with ``seconds``) or ``"failed"`` (with ``error``).
+    """
+    panels = load_manifest(manifest)
+    state_file = Path(state_file) if state_file else _state_paths(manifest)[0]
+    state = _read_state(state_file)
+    entries, stale = [], []
+    for panel in panels:
+        key = panel_key(panel)
+        entry = {"name": panel.name, "output": panel.output, "key": key}
+        current = not force and state.get(panel.output) == key and Path(panel.output).exists()
+        entry["status"] = "up-to-date" if current else "stale"
+        entries.append(entry)
+        if not current:
+            stale.append((panel, entry))
+        log(f"{entry['status']:10s} {panel.name}")
+
+    t0 = time.perf_counter()
+    if stale and not dry_run:
+        def finished(panel, entry, seconds=None, error=None):
+            if error is None:
+                entry.update(status="rendered", seconds=round(seconds, 3))
+                state[panel.output] = entry["key"]
+                _write_json(state_file, state)     # record progress: an interrupted batch resumes
+            else:
+                entry.update(status="failed", error=f"{type(error).__name__}: {error}")
+            log(f"{entry['status']:10s} {panel.name}" + (f"  {error}" if error else f"  {seconds:.1f} s"))
+
+        if jobs <= 1:
+            for panel, entry in stale:
+                try:
+                    finished(panel, entry, _render_job(panel, pipeline))
+                except Exception as exc:
+                    finished(panel, entry, error=exc)
+        else:
+            with patterns.executor(jobs, "process") as pool:
+                futures = {pool.submit(_render_job, panel, pipeline): (panel, entry) for panel, entry in stale}
+                for future in as_completed(futures):
+                    panel, entry = futures[future]
+                    try:
+                        finished(panel, entry, future.result())
+                    except Exception as exc:
+                        finished(panel, entry, error=exc)
+
+    counts = {}
+    for entry in entries:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    return {
+        "manifest": str(Path(manifest).resolve()),
+        "version": __version__,
+        "seconds": round(time.perf_counter() - t0, 3),
+        "counts": counts,
+        "panels": entries,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="quantum-staircase batch",
+                                     description="Render every panel of a TOML manifest")
+    parser.add_argument("manifest", help="Manifest listing the panels")
+    parser.add_argument("--jobs", type=int, default=1, help="Panels rendered concurrently")
+    parser.add_argument("--pipeline", type=int, default=0, metavar="N",
+                        help="Encode each streamed panel on N threads while it renders")
+    parser.add_argument("--force", action="store_true", help="Re-render up-to-date panels too")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which panels are stale")
+    parser.add_argument("--report", default=None, help="Job report path (default: <manifest>.report.json)")
+    args = parser.parse_args(argv)
+
+    report = run(args.manifest, args.jobs, args.force, args.dry_run, pipeline=args.pipeline)
+    report_path = Path(args.report) if args.report else _state_paths(args.manifest)[1]
+    _write_json(report_path, report)
+    print(", ".join(f"{n} {status}" for status, n in sorted(report["counts"].items()))
+          + f"; report: {report_path.resolve()}")
+    return 1 if report["counts"].get("failed") else 0
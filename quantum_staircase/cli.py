@@ -1,17 +1,87 @@
 import argparse
+import sys
+from importlib import import_module
 from pathlib import Path
 from quantum_staircase import utils, patterns
 
+# Literal copies of raster_export.MODES and patterns.BACKENDS: the parser is
+# built before NumPy is imported, so --help and bad arguments return at once.
+_MODES = ("gray8", "gray16", "rgb8", "palette")
+_BACKENDS = ("thread", "process")
+_DEFAULT_CACHE_MB = 2048
+# subcommand → (module, entry point); the default command renders one panel
+_SUBCOMMANDS = {"batch": ("batch", "main"), "preview": ("preview", "main"),
+                "pyramid": ("preview", "pyramid_main")}
+
 def main():
-    parser = argparse.ArgumentParser(description="Quantum Staircase panel exporter")
+    if sys.argv[1:2] and sys.argv[1] in _SUBCOMMANDS:
+        module, entry = _SUBCOMMANDS[sys.argv[1]]
+        module = import_module(f"quantum_staircase.{module}")
+        sys.exit(getattr(module, entry)(sys.argv[2:]))
+    parser = argparse.ArgumentParser(
+        description="Quantum Staircase panel exporter",
+        epilog="Subcommands: 'batch MANIFEST' renders a TOML manifest of panels; 'preview' refines "
+               "a coarse render; 'pyramid' writes or serves deep-zoom tiles (each takes --help)")
     parser.add_argument("--theme", required=True, choices=patterns.list_themes(), help="Pattern theme")
-    parser.add_argument("--outfile", required=True, help="Output image (PNG/SVG)")
+    parser.add_argument("--outfile", required=True, help="Output image (PNG/TIFF/SVG)")
     parser.add_argument("--panel-size-m", type=float, default=3.0, help="Panel size in metres (square)")
     parser.add_argument("--resolution-mm", type=float, default=1.0, help="Pixel resolution in mm")
+    parser.add_argument("--tile-px", type=int, default=None,
+                        help="Render in tiles of this many pixels to bound peak memory")
+    parser.add_argument("--mode", choices=_MODES, default="rgb8",
+                        help="PNG/TIFF pixel format")
+    parser.add_argument("--dither", action="store_true",
+                        help="Ordered dithering instead of rounding to the PNG/TIFF levels")
+    parser.add_argument("--dtype", choices=("float64", "float32"), default="float64",
+                        help="Precision the theme is evaluated in (float32 halves memory)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Render tiles/strips on this many cores")
+    parser.add_argument("--backend", choices=_BACKENDS, default="thread",
+                        help="Pool used with --workers > 1")
+    parser.add_argument("--pipeline", type=int, default=0, metavar="N",
+                        help="Encode/compress PNG/TIFF strips on N threads while the next strips "
+                             "render and earlier ones are written (0: one after another)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Reuse unchanged renders from this on-disk cache directory")
+    parser.add_argument("--cache-max-mb", type=float, default=_DEFAULT_CACHE_MB,
+                        help="Evict least-recently-used cache entries beyond this size")
+    parser.add_argument("--profile", default=None, metavar="TRACE_JSON",
+                        help="Write per-stage timings and peak memory as a Chrome trace")
     args = parser.parse_args()
+    if args.cache_dir:
+        utils.cache.set_cache(args.cache_dir, int(args.cache_max_mb * (1 << 20)))
+    if not args.profile:
+        _export(args)
+        return
+    with utils.profiling.profile() as prof:
+        with utils.profiling.span("cli.main", theme=args.theme, outfile=args.outfile):
+            _export(args)
+    prof.write_trace(args.profile)
+    print(f"Profile: {Path(args.profile).resolve()}")
+    for name, row in sorted(prof.summary().items(), key=lambda kv: -kv[1]["seconds"]):
+        print(f"  {name:28s} {row['calls']:6d}× {row['seconds']:9.3f} s")
+
 
-    pattern_func = patterns.get_theme(args.theme)
-    arr = pattern_func(args.panel_size_m, args.resolution_mm)
+def _export(args):
     img_path = Path(args.outfile)
-    utils.export.save_image(arr, img_path, args.panel_size_m, args.resolution_mm)
+    raster = img_path.suffix.lower() in utils.raster_export.SUFFIXES
+    opts = {"mode": args.mode, "dither": args.dither, "pipeline": args.pipeline} if raster else {}
+    parallel = {"workers": args.workers, "backend": args.backend, "dtype": args.dtype}
+    if args.tile_px and raster:
+        # stream strip by strip: the full panel is never held in memory
+        px = patterns.panel_px(args.panel_size_m, args.resolution_mm)
+        arr = patterns.iter_strips(args.theme, args.panel_size_m, args.resolution_mm,
+                                   rows=args.tile_px, reverse=True, **parallel)
+        opts.update(shape=(px, px), rows_per_strip=args.tile_px)
+    elif args.tile_px or args.workers > 1:
+        arr = patterns.render_tiled(args.theme, args.panel_size_m, args.resolution_mm,
+                                    args.tile_px or patterns.DEFAULT_TILE_PX, **parallel)
+    else:
+        pattern_func = patterns.get_theme(args.theme)
+        # periodic themes stay one unit cell until the exporter reads them strip by strip
+        arr = pattern_func(args.panel_size_m, args.resolution_mm, dtype=args.dtype, lazy=True)
+    utils.export.save_image(arr, img_path, args.panel_size_m, args.resolution_mm, **opts)
     print(f"Saved {img_path.resolve()}")
+    if utils.cache.get_cache() is not None:
+        stats = utils.cache.get_cache().stats
+        print(f"Cache: {stats.hits} hits, {stats.misses} misses, {stats.evictions} evictions")
@@ -1,20 +1,44 @@
-"""Pattern generators registry."""
+"""Pattern generators registry.
+
+Theme names and metadata come from :mod:`._registry` (built-ins plus
+``quantum_staircase.themes`` entry points) without importing NumPy or any
+theme; the rendering helpers are imported on first attribute access.
+"""
 from importlib import import_module
 
-_THEMES = {
-    "ligo": "ligo",
-    "quantum_optics": "quantum_optics",
-    "condensed_matter": "condensed_matter",
-    "amo": "amo",
-    "qec": "qec",
-    "tensor": "tensor_networks",
-    "penrose": "penrose",
+from ._registry import ThemeSpec, get_spec, theme_names
+
+_LAZY = {
+    "get_theme": "_render",
+    "get_window": "_render",
+    "iter_tiles": "_render",
+    "iter_strips": "_render",
+    "render_tiled": "_render",
+    "BACKENDS": "_parallel",
+    "executor": "_parallel",
+    "TiledArray": "_periodic",
+    "DEFAULT_TILE_PX": "_window",
+    "panel_px": "_window",
 }
 
+__all__ = ["ThemeSpec", "get_spec", "list_themes", "get_period", "get_symmetry", *_LAZY]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(import_module(f"{__name__}.{_LAZY[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def list_themes():
-    return sorted(_THEMES.keys())
+    return theme_names()
+
+
+def get_period(name):
+    """``(rows, cols)`` pixel period of a theme that declares one, else ``None``."""
+    return get_spec(name).period
+
 
-def get_theme(name):
-    modname = _THEMES[name]
-    mod = import_module(f"quantum_staircase.patterns.{modname}")
-    return mod.generate
+def get_symmetry(name):
+    """``"mirror"``/``"radial"`` for themes evaluated on one quadrant (see :mod:`._symmetry`), else ``None``."""
+    return get_spec(name).symmetry
@@ -0,0 +1,107 @@
+"""Multi-core scheduling of independent render jobs.
+
+A job is ``(index, fn, args)``: ``fn(*args)`` returns the pixels destined for
+``out[index]``.  Two backends share the same interface:
+
+thread   a thread pool writing straight into *out*; scales with kernels
+         that release the GIL (most large NumPy ufuncs do)
+process  a process pool; when *out* is (a contiguous view of) a writable
+         file-backed ``np.memmap`` the workers map the same file and write
+         their pixels straight into it, otherwise each job's pixels travel
+         back to the parent, at most *workers* jobs ahead, and are stored
+         there.  Either way no panel-sized staging buffer is allocated.
+
+*fn* and *args* must be picklable for the process backend (module-level
+functions, plain values).  Workers inherit the parent's active on-disk cache.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from quantum_staircase.utils import cache
+
+BACKENDS = ("thread", "process")
+
+
+def executor(workers, backend="thread"):
+    """A *workers*-wide pool for *backend*; process workers inherit the active on-disk cache."""
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, not {backend!r}")
+    if backend == "thread":
+        return ThreadPoolExecutor(workers)
+    active = cache.get_cache()
+    initargs = (None, 0) if active is None else (str(active.directory), active.max_bytes)
+    return ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs)
+
+
+def _init_worker(cache_dir, max_bytes):
+    if cache_dir is not None:
+        cache.set_cache(cache_dir, max_bytes)
+
+
+def _store(out, index, fn, args):
+    out[index] = fn(*args)
+
+
+def _file_region(out):
+    """``(filename, offset)`` of *out* if it is a C-contiguous view of a writable memmap."""
+    root = out
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not (isinstance(root, np.memmap) and root.filename and root.mode != "r"
+            and out.flags.c_contiguous):
+        return None
+    return root.filename, root.offset + out.ctypes.data - root.ctypes.data
+
+
+def _store_file(filename, offset, shape, dtype, index, fn, args):
+    view = np.memmap(filename, dtype, "r+", offset, shape)
+    view[index] = fn(*args)
+    del view
+
+
+def fill(out, jobs, workers=1, backend="thread"):
+    """Run every job and store its result in ``out[index]``; returns *out*."""
+    if workers <= 1:
+        for index, fn, args in jobs:
+            out[index] = fn(*args)
+        return out
+    if backend != "process":
+        with executor(workers, backend) as pool:
+            for future in [pool.submit(_store, out, *job) for job in jobs]:
+                future.result()
+        return out
+
+    region = _file_region(out)
+    if region is None:
+        for index, pixels in imap(jobs, workers, backend):
+            out[index] = pixels
+        return out
+    with executor(workers, backend) as pool:
+        futures = [pool.submit(_store_file, *region, out.shape, out.dtype.str, *job) for job in jobs]
+        for future in futures:
+            future.result()
+    return out
+
+
+def imap(jobs, workers=1, backend="thread"):
+    """Yield ``(index, pixels)`` in job order with at most *workers* jobs ahead.
+
+    The results travel back to the caller, so this suits streaming consumers
+    (file writers) rather than a preallocated output.
+    """
+    if workers <= 1:
+        for index, fn, args in jobs:
+            yield index, fn(*args)
+        return
+    with executor(workers, backend) as pool:
+        pending = deque()
+        for index, fn, args in jobs:
+            pending.append((index, pool.submit(fn, *args)))
+            if len(pending) > workers:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
@@ -0,0 +1,132 @@
+"""Periodic themes: evaluate one unit cell, tile it.
+
+A theme module opts in by declaring ``PERIOD = (rows, cols)`` in pixels and
+``unit_cell(dtype)`` returning the ``PERIOD``-shaped cell whose pixel
+``(r, c)`` equals panel pixel ``(r, c)``; the pattern repeats it across the
+panel.  :func:`periodic_window` block-copies the cell into an ordinary array,
+or with ``lazy=True`` returns a :class:`TiledArray` — a read-only stand-in
+for the window that materialises only the pixels that are indexed (exporters
+read it strip by strip), and stays lazy under elementwise arithmetic with
+scalars, which is applied to the cell alone.  Anything else it is asked for
+(other methods, boolean or fancy indexing) is served by the materialised
+array.
+"""
+from numbers import Number
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+from ._window import check_window, panel_px, window_buffer
+
+
+class TiledArray(NDArrayOperatorsMixin):
+    """``(h, w)`` window whose pixel ``(r, c)`` is ``cell[(r + y0) % py, (c + x0) % px]``."""
+
+    ndim = 2
+
+    def __init__(self, cell, shape, offset=(0, 0)):
+        self.cell = cell
+        self.shape = tuple(shape)
+        self.offset = (offset[0] % cell.shape[0], offset[1] % cell.shape[1])
+
+    @property
+    def dtype(self):
+        return self.cell.dtype
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"TiledArray(shape={self.shape}, cell={self.cell.shape}, dtype={self.dtype})"
+
+    def __getattr__(self, name):
+        # ndarray methods and attributes not implemented here act on the materialised window
+        if name.startswith("__") or name == "cell":
+            raise AttributeError(name)
+        return getattr(np.asarray(self), name)
+
+    @staticmethod
+    def _basic(k):
+        return isinstance(k, slice) or (isinstance(k, (int, np.integer)) and not isinstance(k, bool))
+
+    def _rows_cols(self, key):
+        """Row and column indices of a key of ints and slices, or ``None`` for other keys."""
+        if not isinstance(key, tuple):
+            key = (key,)
+        if sum(k is Ellipsis for k in key) == 1:
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),) * (3 - len(key)) + key[i + 1:]
+        if len(key) > 2 or not all(self._basic(k) for k in key):
+            return None
+        key = key + (slice(None),) * (2 - len(key))
+        return np.arange(self.shape[0])[key[0]], np.arange(self.shape[1])[key[1]]
+
+    def __getitem__(self, key):
+        index = self._rows_cols(key)
+        if index is None:
+            return np.asarray(self)[key]
+        rows, cols = index
+        py, px = self.cell.shape
+        r = (np.atleast_1d(rows) + self.offset[0]) % py
+        c = (np.atleast_1d(cols) + self.offset[1]) % px
+        out = self.cell[np.ix_(r, c)]
+        if np.ndim(rows) == 0:
+            out = out[0]
+        if np.ndim(cols) == 0:
+            out = out[..., 0]
+        return out
+
+    def _phases(self):
+        """The block holding every distinct pixel of the window once (at most one cell)."""
+        return self[:min(self.cell.shape[0], self.shape[0]), :min(self.cell.shape[1], self.shape[1])]
+
+    def min(self):
+        return self._phases().min()
+
+    def max(self):
+        return self._phases().max()
+
+    def __array__(self, dtype=None, copy=None):
+        out = self[:, :]
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method == "__call__" and "out" not in kwargs and all(
+            x is self or isinstance(x, Number) or (isinstance(x, np.ndarray) and x.ndim == 0)
+            for x in inputs
+        ):
+            cell = ufunc(*(self.cell if x is self else x for x in inputs), **kwargs)
+            if isinstance(cell, np.ndarray):
+                return TiledArray(cell, self.shape, self.offset)
+        inputs = tuple(np.asarray(x) if isinstance(x, TiledArray) else x for x in inputs)
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def fill_into(self, out):
+        """Tile the window into *out*: one band of cell rows, then block copies of it."""
+        h, w = self.shape
+        py = self.cell.shape[0]
+        band = self[:min(py, h), :]
+        for top in range(0, h, py):
+            out[top:top + py] = band[:min(py, h - top)]
+        return out
+
+
+def periodic_window(unit_cell, period, panel_size_m, resolution_mm, x0, y0, w, h,
+                    dtype=np.float64, out=None, lazy=False):
+    """``generate_window`` of the pattern repeating ``unit_cell(dtype)`` every *period*.
+
+    The cell is tiled into *out* (allocated if omitted), or with *lazy* and
+    no *out* the window is returned as a :class:`TiledArray`.
+    """
+    check_window(panel_px(panel_size_m, resolution_mm), x0, y0, w, h)
+    cell = unit_cell(np.dtype(dtype if out is None else out.dtype))
+    if cell.shape != tuple(period):
+        raise ValueError(f"unit_cell has shape {cell.shape}, expected period {tuple(period)}")
+    tiled = TiledArray(cell, (h, w), (y0, x0))
+    if lazy and out is None:
+        return tiled
+    return tiled.fill_into(window_buffer(w, h, dtype, out))
@@ -0,0 +1,115 @@
+"""Theme metadata, discovered without importing any theme module.
+
+Every theme is described by a :class:`ThemeSpec`.  The built-in specs live
+here; further themes are found through ``importlib.metadata`` entry points in
+the ``quantum_staircase.themes`` group, e.g. in a plugin's ``pyproject.toml``::
+
+    [project.entry-points."quantum_staircase.themes"]
+    moire = "moire_theme.spec:SPEC"      # a ThemeSpec or a dict of its fields
+    # or simply: moire = "moire_theme"   # the theme module itself
+
+Listing themes reads entry-point names only; a spec is loaded on first use,
+and the theme module (with NumPy and friends) only when it renders.  A theme
+module provides ``generate`` and ``generate_window`` as in the README.
+"""
+from functools import lru_cache
+from importlib import import_module
+from types import ModuleType
+from typing import NamedTuple, Optional, Tuple
+
+ENTRY_POINT_GROUP = "quantum_staircase.themes"
+OUTPUTS = ("raster", "vector", "both")
+
+
+class ThemeSpec(NamedTuple):
+    """What a theme is and can do.
+
+    output     ``"raster"`` bitmaps, ``"vector"`` polygons, or ``"both"``
+    period     ``(rows, cols)`` pixel period of a periodic theme
+    symmetry   ``"mirror"`` / ``"radial"`` about the panel centre
+    windowed   ``generate_window`` is cheaper than cropping ``generate``
+    """
+
+    name: str
+    module: str
+    output: str = "raster"
+    period: Optional[Tuple[int, int]] = None
+    symmetry: Optional[str] = None
+    windowed: bool = True
+    description: str = ""
+
+
+def _builtin(name, module, **kwargs):
+    return ThemeSpec(name, f"quantum_staircase.patterns.{module}", **kwargs)
+
+
+LIGO = _builtin("ligo", "ligo", description="Interferometer fringes")
+QUANTUM_OPTICS = _builtin("quantum_optics", "quantum_optics", description="Squeezed-state Wigner function")
+CONDENSED_MATTER = _builtin("condensed_matter", "condensed_matter", period=(6, 6),
+                            description="Diagonal lattice stripes")
+AMO = _builtin("amo", "amo", symmetry="radial", description="Circular trap lattice")
+QEC = _builtin("qec", "qec", period=(40, 40), description="Surface-code checkerboard")
+TENSOR = _builtin("tensor", "tensor_networks", symmetry="radial", description="Hyperbolic rings")
+PENROSE = _builtin("penrose", "penrose", output="both", description="Penrose rhomb tiling")
+
+BUILTIN_THEMES = {s.name: s for s in (LIGO, QUANTUM_OPTICS, CONDENSED_MATTER, AMO, QEC, TENSOR, PENROSE)}
+
+
+def _entry_points():
+    from importlib import metadata   # ~25 ms; only paid once themes are listed
+
+    eps = metadata.entry_points()
+    if hasattr(eps, "select"):
+        return eps.select(group=ENTRY_POINT_GROUP)
+    return eps.get(ENTRY_POINT_GROUP, [])   # Python 3.9
+
+
+@lru_cache(maxsize=None)
+def _sources():
+    """``{name: ThemeSpec or unloaded entry point}``; built-ins win over entry points."""
+    sources = {ep.name: ep for ep in _entry_points()}
+    sources.update(BUILTIN_THEMES)
+    return sources
+
+
+def theme_names():
+    return sorted(_sources())
+
+
+def _from_module(name, module: ModuleType) -> ThemeSpec:
+    period = getattr(module, "PERIOD", None)
+    return ThemeSpec(
+        name, module.__name__,
+        output=getattr(module, "OUTPUT", "raster"),
+        period=None if period is None else tuple(period),
+        symmetry=getattr(module, "SYMMETRY", None),
+        windowed=hasattr(module, "generate_window"),
+        description=(module.__doc__ or "").strip().split("\n")[0],
+    )
+
+
+@lru_cache(maxsize=None)
+def get_spec(name) -> ThemeSpec:
+    """The :class:`ThemeSpec` of theme *name* (loads a plugin's spec, not its theme)."""
+    try:
+        source = _sources()[name]
+    except KeyError:
+        raise KeyError(f"Unknown theme {name!r}; available: {', '.join(theme_names())}") from None
+    if isinstance(source, ThemeSpec):
+        return source
+    obj = source.load()
+    if isinstance(obj, ModuleType):
+        spec = _from_module(name, obj)
+    elif isinstance(obj, ThemeSpec):
+        spec = obj._replace(name=name)
+    else:
+        spec = ThemeSpec(**{**dict(obj), "name": name})
+    if spec.period is not None:
+        spec = spec._replace(period=tuple(spec.period))
+    if spec.output not in OUTPUTS:
+        raise ValueError(f"Theme {name!r} declares output {spec.output!r}, not one of {OUTPUTS}")
+    return spec
+
+
+def theme_module(name) -> ModuleType:
+    return import_module(get_spec(name).module)
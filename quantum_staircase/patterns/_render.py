@@ -0,0 +1,126 @@
+"""Rendering entry points behind the theme registry: caching, tiling, pools."""
+import numpy as np
+
+from quantum_staircase.utils import cache, profiling
+
+from . import _parallel
+from ._periodic import periodic_window
+from ._registry import get_spec, theme_module
+from ._window import DEFAULT_TILE_PX, iter_windows, panel_px
+
+
+def _params(panel_size_m, resolution_mm, dtype):
+    return {"panel_size_m": panel_size_m, "resolution_mm": resolution_mm,
+            "dtype": np.dtype(dtype).str}
+
+
+def get_theme(name):
+    """Return ``generate(panel_size_m, resolution_mm, dtype=np.float64, out=None, lazy=False)``.
+
+    Renders are served from the active cache if any; *out* is filled in place.
+    *lazy* is as for :func:`get_window`.
+    """
+    window = get_window(name)
+
+    def generate(panel_size_m, resolution_mm, dtype=np.float64, out=None, lazy=False):
+        px = panel_px(panel_size_m, resolution_mm)
+        return window(panel_size_m, resolution_mm, 0, 0, px, px, dtype, out, lazy)
+    return generate
+
+
+def get_window(name):
+    """Return ``generate_window(panel_size_m, resolution_mm, x0, y0, w, h, dtype, out, lazy=False)``.
+
+    Windows go through the active :mod:`~quantum_staircase.utils.cache`; a
+    full-panel window shares its entry with :func:`get_theme`.  Periodic
+    themes (see ``patterns.get_period``) skip the cache, as tiling their unit
+    cell is cheaper; with ``lazy=True`` and no *out* they return a lazy
+    :class:`~._periodic.TiledArray` of that one cell (other themes ignore
+    *lazy*).
+    """
+    module = theme_module(name)
+    gen = module.generate_window
+    period = get_spec(name).period
+
+    def generate_window(panel_size_m, resolution_mm, x0, y0, w, h, dtype=np.float64, out=None,
+                        lazy=False):
+        with profiling.span(f"theme.{name}", x0=x0, y0=y0, w=w, h=h):
+            if lazy and period is not None and out is None:
+                return periodic_window(module.unit_cell, period, panel_size_m, resolution_mm,
+                                       x0, y0, w, h, dtype, lazy=True)
+            return _generate(panel_size_m, resolution_mm, x0, y0, w, h, dtype, out)
+
+    def _generate(panel_size_m, resolution_mm, x0, y0, w, h, dtype, out):
+        if period is not None or cache.get_cache() is None:
+            return gen(panel_size_m, resolution_mm, x0, y0, w, h, dtype, out)
+        dtype = dtype if out is None else out.dtype
+        img = cache.cached(name, _params(panel_size_m, resolution_mm, dtype),
+                           lambda: gen(panel_size_m, resolution_mm, x0, y0, w, h, dtype),
+                           window=(x0, y0, w, h))
+        if out is None:
+            return img
+        out[...] = img
+        return out
+    return generate_window
+
+
+def _render_window(name, panel_size_m, resolution_mm, x0, y0, w, h, dtype=np.float64):
+    return get_window(name)(panel_size_m, resolution_mm, x0, y0, w, h, dtype)
+
+
+def _window_jobs(name, panel_size_m, resolution_mm, windows, dtype=np.float64):
+    for x0, y0, w, h in windows:
+        index = (slice(y0, y0 + h), slice(x0, x0 + w))
+        yield index, _render_window, (name, panel_size_m, resolution_mm, x0, y0, w, h, dtype)
+
+
+def iter_tiles(name, panel_size_m, resolution_mm, tile_px=DEFAULT_TILE_PX,
+               workers=1, backend="thread", dtype=np.float64):
+    """Yield ``(x0, y0, tile)`` windows covering the panel in row-major order.
+
+    Only a few tiles are alive at a time (one, plus one per extra worker), so
+    peak memory is bounded by *tile_px* rather than by the panel size.
+    """
+    px = panel_px(panel_size_m, resolution_mm)
+    jobs = _window_jobs(name, panel_size_m, resolution_mm, iter_windows(px, tile_px), dtype)
+    for (rows, cols), tile in _parallel.imap(jobs, workers, backend):
+        yield cols.start, rows.start, tile
+
+
+def iter_strips(name, panel_size_m, resolution_mm, rows=DEFAULT_TILE_PX, reverse=False,
+                workers=1, backend="thread", dtype=np.float64):
+    """Yield full-width row strips of at most *rows* rows.
+
+    ``reverse=True`` walks from the last row backwards (strips still in array
+    orientation), which is the file order of an ``origin="lower"`` image.
+    With ``workers > 1`` upcoming strips are rendered ahead in parallel.
+    """
+    px = panel_px(panel_size_m, resolution_mm)
+
+    def windows():
+        for top in range(0, px, rows):
+            y0, y1 = (max(0, px - top - rows), px - top) if reverse else (top, min(top + rows, px))
+            yield 0, y0, px, y1 - y0
+
+    jobs = _window_jobs(name, panel_size_m, resolution_mm, windows(), dtype)
+    for _, strip in _parallel.imap(jobs, workers, backend):
+        yield strip
+
+
+def render_tiled(name, panel_size_m, resolution_mm, tile_px=DEFAULT_TILE_PX, out=None,
+                 workers=1, backend="thread", dtype=np.float64):
+    """Render a full panel window by window into *out* (allocated if omitted).
+
+    *out* may be any writable ``(px, px)`` array, e.g. an ``np.memmap`` for
+    panels that do not fit in memory; tiles are rendered in its dtype
+    (*dtype* when allocating).  ``workers > 1`` renders the tiles on a
+    thread or process pool (see :mod:`._parallel`).
+    """
+    px = panel_px(panel_size_m, resolution_mm)
+    if out is None:
+        out = np.empty((px, px), dtype)
+    elif out.shape != (px, px):
+        raise ValueError(f"out has shape {out.shape}, expected {(px, px)}")
+    jobs = _window_jobs(name, panel_size_m, resolution_mm, iter_windows(px, tile_px), out.dtype)
+    with profiling.span("render_tiled", theme=name, px=px, workers=workers, backend=backend):
+        return _parallel.fill(out, list(jobs), workers, backend)
@@ -0,0 +1,160 @@
+"""Symmetry-aware evaluation for mirror-symmetric and radial themes.
+
+Patterns centred on ``px / 2`` only depend on ``|dx|`` and ``|dy|``, the
+pixel offsets from the centre.  The reflection ``c → px - c`` maps columns
+``1 … px-1`` onto themselves, so a window holds at most about half as many
+distinct ``|dx|`` values as columns (likewise rows): the field is evaluated
+once on that quadrant and copied into the window as mirrored blocks.  Mirrored
+pixels see bit-identical offsets, so the result equals direct evaluation.
+The quadrant is stored in the window's dtype and filled a few rows at a
+time, so the field's float64 temporaries stay small however large the
+window (*field* must be elementwise).
+
+Radial themes go further: the profile ``f(r)`` is tabulated on a uniform
+radius grid and linearly interpolated.  With spacing ``δ`` the error is at
+most ``δ² · max|f''| / 8``, so ``δ`` is chosen from the theme's declared
+curvature bound to meet *tol*; when the table would be larger than the
+quadrant, the profile is evaluated directly instead.
+
+Theme modules opt in by declaring ``SYMMETRY`` (reported by the registry's
+``get_symmetry``) and building ``generate_window`` on
+
+mirror   :func:`mirrored_window` with ``field(adx, ady)`` of broadcast
+         ``|dx|`` (row vector) and ``|dy|`` (column vector)
+radial   :func:`radial_window` with ``profile(r)``, a bound on ``|f''|`` and
+         ``bounds(rmin, rmax)`` giving the exact range for normalisation
+
+:func:`mirrored_samples` and :func:`radial_samples` evaluate the same field
+at arbitrary pixel rows and columns (e.g. every ``step``-th one for a
+preview), bit-identical to those pixels of the full render.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from ._window import check_window, normalise, radial_range, window_buffer
+
+SYMMETRIES = ("mirror", "radial")
+RADIAL_TOL = 1e-6
+CHUNK_PIXELS = 1 << 16      # quadrant pixels evaluated per pass
+
+
+def _folded(px, index):
+    """Distinct ``|offset|`` values of the pixel indices *index* from ``px / 2``, and each index's slot."""
+    twice = np.abs(2 * np.asarray(index, np.intp) - px)   # exact integers
+    distinct, slot = np.unique(twice, return_inverse=True)
+    return distinct / 2, slot.reshape(-1)
+
+
+def _runs(slot):
+    """Split *slot* into runs stepping by ±1: ``(window slice, quadrant slice)`` pairs."""
+    n = len(slot)
+    step = np.diff(slot)
+    runs, start = [], 0
+    while start < n:
+        d = int(step[start]) if start < n - 1 and abs(step[start]) == 1 else 1
+        off = np.flatnonzero(step[start:] != d)
+        stop = start + 1 + (int(off[0]) if len(off) else n - 1 - start)
+        first, last = int(slot[start]), int(slot[stop - 1])
+        src = slice(first, last + 1) if d > 0 else slice(first, last - 1 if last else None, -1)
+        runs.append((slice(start, stop), src))
+        start = stop
+    return runs
+
+
+def gather(quadrant, rows, cols, out):
+    """``out[i, j] = quadrant[rows[i], cols[j]]`` as a few (possibly reversed) block copies."""
+    col_runs = _runs(cols)
+    for dst_r, src_r in _runs(rows):
+        for dst_c, src_c in col_runs:
+            out[dst_r, dst_c] = quadrant[src_r, src_c]
+    return out
+
+
+def mirrored_window(field, px, x0, y0, w, h, dtype=np.float64, out=None):
+    """Window of ``field(|dx|, |dy|)``, evaluated once per distinct offset pair."""
+    check_window(px, x0, y0, w, h)
+    pattern = window_buffer(w, h, dtype, out)
+    adx, cols = _folded(px, np.arange(x0, x0 + w))
+    ady, rows = _folded(px, np.arange(y0, y0 + h))
+    return gather(_quadrant(field, adx, ady, pattern.dtype), rows, cols, pattern)
+
+
+def mirrored_samples(field, px, rows, cols, dtype=np.float64):
+    """``full[np.ix_(rows, cols)]`` of the :func:`mirrored_window` panel, for 1-D index vectors."""
+    adx, col_slot = _folded(px, cols)
+    ady, row_slot = _folded(px, rows)
+    return _quadrant(field, adx, ady, np.dtype(dtype))[np.ix_(row_slot, col_slot)]
+
+
+def _quadrant(field, adx, ady, dtype):
+    quadrant = np.empty((len(ady), len(adx)), dtype)
+    step = max(1, CHUNK_PIXELS // max(1, len(adx)))
+    for top in range(0, len(ady), step):
+        quadrant[top:top + step] = field(adx[None, :], ady[top:top + step, None])
+    return quadrant
+
+
+@lru_cache(maxsize=8)
+def _profile_table(profile, curvature, rmax, tol, dtype):
+    """Radius spacing and the tabulated profile (values, slopes per unit index) in *dtype*."""
+    delta = np.sqrt(8 * tol / curvature) if curvature > 0 else rmax + 1.0
+    n = int(np.ceil(rmax / delta)) + 2
+    values = profile(np.arange(n) * delta)
+    table = values[:-1].astype(dtype), np.diff(values).astype(dtype)
+    for t in table:
+        t.flags.writeable = False
+    return (delta, *table)
+
+
+def _radius(adx, ady):
+    r = np.add(adx * adx, ady * ady)
+    return np.sqrt(r, out=r)
+
+
+def radial_field(profile, curvature, px, tol=RADIAL_TOL, dtype=np.float64):
+    """``field(adx, ady)`` computing ``profile(hypot(adx, ady))`` within *tol*.
+
+    The table depends only on *px* and *dtype* (it is stored in the render's
+    precision and shared by the windows of a panel), so every window
+    interpolates identically and windows stay bit-exact slices of the full
+    render.
+    """
+    rmax = radial_range(px)[1]
+    quadrant_px = (px // 2 + 1) ** 2
+    if curvature > 0 and rmax * np.sqrt(curvature / (8 * tol)) > quadrant_px:
+        return lambda adx, ady: profile(_radius(adx, ady))
+    delta, values, slopes = _profile_table(profile, curvature, rmax, tol, np.dtype(dtype))
+
+    def field(adx, ady):
+        t = _radius(adx, ady)
+        t *= 1 / delta
+        i = t.astype(np.intp)
+        t -= i
+        t *= slopes[i]
+        t += values[i]
+        return t
+    return field
+
+
+def radial_window(profile, curvature, bounds, px, x0, y0, w, h, dtype=np.float64, out=None,
+                  tol=RADIAL_TOL):
+    """Window of ``profile(r)`` normalised by ``bounds(rmin, rmax)`` of the panel radii."""
+    dtype = np.dtype(dtype if out is None else out.dtype)
+    field = _normalised_field(profile, curvature, bounds, px, tol, dtype)
+    return mirrored_window(field, px, x0, y0, w, h, dtype, out)
+
+
+def radial_samples(profile, curvature, bounds, px, rows, cols, dtype=np.float64, tol=RADIAL_TOL):
+    """``full[np.ix_(rows, cols)]`` of the :func:`radial_window` panel: the profile at the sampled radii."""
+    field = _normalised_field(profile, curvature, bounds, px, tol, np.dtype(dtype))
+    return mirrored_samples(field, px, rows, cols, dtype)
+
+
+def _normalised_field(profile, curvature, bounds, px, tol, dtype):
+    field = radial_field(profile, curvature, px, tol, dtype)
+    lo, hi = bounds(*radial_range(px))
+
+    def normalised(adx, ady):
+        return normalise(field(adx, ady), lo, hi)
+    return normalised
@@ -0,0 +1,78 @@
+"""Pixel-window helpers shared by the ``generate_window`` theme entry points.
+
+Windows are given as ``(x0, y0, w, h)`` in panel pixels: ``x0`` is the first
+column, ``y0`` the first row, and the returned array has shape ``(h, w)``,
+i.e. ``generate_window(...) == generate(...)[y0:y0+h, x0:x0+w]`` bit for bit.
+
+Every generator also takes ``dtype=`` (float32 halves memory) and ``out=``
+(an ``(h, w)`` buffer evaluated in place; its dtype wins over *dtype*).
+Coordinates are broadcast 1-D vectors and normalisation uses bounds known in
+closed form, so peak memory is about one output array and no extra pass over
+the panel is needed to find its min/max.
+"""
+import numpy as np
+
+DEFAULT_TILE_PX = 1024
+
+
+def panel_px(panel_size_m, resolution_mm):
+    """Pixels along one edge of a square panel (same rounding as ``generate``)."""
+    return int(panel_size_m * 1000 / resolution_mm)
+
+
+def check_window(px, x0, y0, w, h):
+    if min(x0, y0, w, h) < 0 or x0 + w > px or y0 + h > px:
+        raise ValueError(f"Window ({x0}, {y0}, {w}, {h}) lies outside the {px}×{px} panel")
+
+
+def window_indices(x0, y0, w, h):
+    """Row index column-vector and column index row-vector for a window."""
+    return np.arange(y0, y0 + h)[:, None], np.arange(x0, x0 + w)[None, :]
+
+
+def iter_windows(px, tile_px=DEFAULT_TILE_PX):
+    """Yield ``(x0, y0, w, h)`` covering a ``px``×``px`` panel in row-major order."""
+    if tile_px <= 0:
+        raise ValueError("tile_px must be positive")
+    for y0 in range(0, px, tile_px):
+        for x0 in range(0, px, tile_px):
+            yield x0, y0, min(tile_px, px - x0), min(tile_px, px - y0)
+
+
+def window_buffer(w, h, dtype=np.float64, out=None):
+    """The ``(h, w)`` array a window is evaluated into: *out*, or a new one of *dtype*."""
+    if out is None:
+        return np.empty((h, w), dtype)
+    if out.shape != (h, w):
+        raise ValueError(f"out has shape {out.shape}, expected {(h, w)}")
+    return out
+
+
+def normalise(buf, lo, hi):
+    """Map ``[lo, hi]`` onto ``[0, 1]`` in place."""
+    buf -= lo
+    buf /= hi - lo
+    return buf
+
+
+def radial_offsets(px, x0, y0, w, h, dtype=np.float64):
+    """Column and row offsets of a window from the panel centre, as 1-D vectors."""
+    center = px / 2
+    return (np.arange(x0, x0 + w) - center).astype(dtype), (np.arange(y0, y0 + h) - center).astype(dtype)
+
+
+def radial_range(px):
+    """Smallest and largest distance of any panel pixel from the centre ``px / 2``."""
+    d = 0.0 if px % 2 == 0 else 0.5
+    return float(np.hypot(d, d)), float(np.hypot(px / 2, px / 2))
+
+
+def sin2_bounds(t0, t1):
+    """Exact ``(min, max)`` of ``sin(t)**2`` over ``t0 <= t <= t1``."""
+    def hits(phase):   # does phase + k·π fall inside [t0, t1] for some integer k?
+        return np.floor((t1 - phase) / np.pi) >= np.ceil((t0 - phase) / np.pi)
+
+    ends = np.sin([t0, t1]) ** 2
+    lo = 0.0 if hits(0.0) else float(ends.min())
+    hi = 1.0 if hits(np.pi / 2) else float(ends.max())
+    return lo, hi
@@ -1,11 +1,31 @@
 """Circular AMO trap lattice pattern."""
 import numpy as np
 
-def generate(panel_size_m, resolution_mm):
-    px = int(panel_size_m * 1000 / resolution_mm)
-    center = px / 2
-    yy, xx = np.indices((px, px))
-    r = np.hypot(xx-center, yy-center)
-    pattern = np.sin(r / 15) ** 2
-    pattern = (pattern - pattern.min()) / (pattern.max() - pattern.min())
-    return pattern
+from ._symmetry import radial_samples, radial_window
+from ._window import panel_px, sin2_bounds
+
+SYMMETRY = "radial"
+PROFILE_CURVATURE = 2 / 225   # |d²/dr² sin²(r/15)| = |2/225 · cos(2r/15)|
+
+
+def profile(r):
+    return np.sin(r / 15) ** 2
+
+
+def profile_bounds(rmin, rmax):
+    return sin2_bounds(rmin / 15, rmax / 15)
+
+
+def generate(panel_size_m, resolution_mm, dtype=np.float64, out=None):
+    px = panel_px(panel_size_m, resolution_mm)
+    return generate_window(panel_size_m, resolution_mm, 0, 0, px, px, dtype, out)
+
+
+def generate_window(panel_size_m, resolution_mm, x0, y0, w, h, dtype=np.float64, out=None):
+    px = panel_px(panel_size_m, resolution_mm)
+    return radial_window(profile, PROFILE_CURVATURE, profile_bounds, px, x0, y0, w, h, dtype, out)
+
+
+def generate_samples(panel_size_m, resolution_mm, rows, cols, dtype=np.float64):
+    px = panel_px(panel_size_m, resolution_mm)
+    return radial_samples(profile, PROFILE_CURVATURE, profile_bounds, px, rows, cols, dtype)
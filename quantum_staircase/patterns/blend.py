@@ -0,0 +1,183 @@
+"""
+Blended multi-theme wall panels, rendered lazily segment by segment.
+
+The panel is cut along the blend axis into consecutive themes of
+``slice_px`` each; around every interface a band of ``2 * blend_px`` pixels
+cross-fades the two neighbours with a cosine weight.  Pixel ``(r, c)`` of
+every theme is pixel ``(r, c)`` of that theme rendered on the full
+``max(width, height)`` square canvas, so blends line up exactly as if each
+theme had been pre-rendered over the whole wall and cropped — but only the
+windows a theme actually contributes are ever generated.
+
+:func:`panel_segments` lists disjoint segments (pure slices, blend bands and
+an empty tail), :func:`render_segment` renders one of them independently,
+and :func:`build_panel` / :func:`iter_segments` assemble or stream them on
+a thread or process pool (:mod:`._parallel`).
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import _parallel
+from ._render import get_window
+from ._window import DEFAULT_TILE_PX, panel_px
+
+
+class Segment(NamedTuple):
+    """Output pixels ``[start, stop)`` along the blend axis.
+
+    ``theme_b is None`` marks a pure slice of ``theme_a``; both ``None``
+    marks the zero tail left over when the slices do not fill the panel.
+    """
+
+    start: int
+    stop: int
+    theme_a: Optional[str]
+    theme_b: Optional[str] = None
+
+
+def _cos_blend(a: np.ndarray, b: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """Cosine-smoothed blend between two arrays along the blending axis."""
+    weight = (1 - np.cos(np.pi * w)) / 2  # 0→1
+    return (1 - weight) * a + weight * b
+
+
+def panel_shape(width_m: float, height_m: float, res_mm: float) -> Tuple[int, int]:
+    """``(rows, cols)`` of a ``width_m`` × ``height_m`` panel."""
+    return panel_px(height_m, res_mm), panel_px(width_m, res_mm)
+
+
+def panel_segments(
+    width_m: float,
+    height_m: float,
+    res_mm: float,
+    theme_names: Sequence[str],
+    blend_frac: float,
+    axis: str = "y",
+) -> List[Segment]:
+    """Disjoint segments covering the panel along *axis*, in order."""
+    if axis not in ("x", "y"):
+        raise ValueError(f"axis must be 'x' or 'y', not {axis!r}")
+    rows, cols = panel_shape(width_m, height_m, res_mm)
+    length = rows if axis == "y" else cols
+    n = len(theme_names)
+    slice_px = length // n
+    blend_px = max(1, int(blend_frac * slice_px))
+    if n > 1 and 2 * blend_px > slice_px:
+        raise ValueError(f"Blend bands of {blend_px} px overlap in {slice_px} px slices; "
+                         "use blend_frac <= 0.5")
+
+    segments = []
+    for i, theme in enumerate(theme_names):
+        start = i * slice_px + (blend_px if i > 0 else 0)
+        stop = (i + 1) * slice_px - (blend_px if i < n - 1 else 0)
+        if stop > start:
+            segments.append(Segment(start, stop, theme))
+        if i < n - 1:
+            mid = (i + 1) * slice_px
+            segments.append(Segment(mid - blend_px, mid + blend_px, theme, theme_names[i + 1]))
+    if n * slice_px < length:
+        segments.append(Segment(n * slice_px, length, None))
+    return segments
+
+
+def render_segment(
+    segment: Segment,
+    width_m: float,
+    height_m: float,
+    res_mm: float,
+    axis: str = "y",
+    across: Optional[Tuple[int, int]] = None,
+    dtype=np.float64,
+) -> np.ndarray:
+    """Pixels of one segment: ``(stop - start, cols)`` rows for ``axis="y"``,
+    ``(rows, stop - start)`` columns for ``axis="x"``.
+
+    *across* restricts the other axis to ``[lo, hi)`` (columns for
+    ``axis="y"``), so one segment can be split between workers.
+    """
+    rows, cols = panel_shape(width_m, height_m, res_mm)
+    lo, hi = across or (0, cols if axis == "y" else rows)
+    canvas_m = max(width_m, height_m)
+    start, stop, theme_a, theme_b = segment
+    n = stop - start
+    if axis == "y":
+        window, shape = (lo, start, hi - lo, n), (n, hi - lo)
+    else:
+        window, shape = (start, lo, n, hi - lo), (hi - lo, n)
+    if theme_a is None:
+        return np.zeros(shape, dtype)
+
+    a = get_window(theme_a)(canvas_m, res_mm, *window, dtype)
+    if theme_b is None:
+        return np.clip(a, 0, 1)
+    b = get_window(theme_b)(canvas_m, res_mm, *window, dtype)
+    w = np.linspace(0, 1, n).astype(dtype)
+    return np.clip(_cos_blend(a, b, w[:, None] if axis == "y" else w), 0, 1)
+
+
+def iter_segments(
+    width_m: float,
+    height_m: float,
+    res_mm: float,
+    theme_names: Sequence[str],
+    blend_frac: float,
+    axis: str = "y",
+    workers: int = 1,
+    reverse: bool = False,
+    backend: str = "process",
+    dtype=np.float64,
+) -> Iterator[Tuple[Segment, np.ndarray]]:
+    """Yield ``(segment, pixels)`` in panel order, rendering up to *workers* ahead.
+
+    ``reverse=True`` yields the last segment first: for ``axis="y"`` that is
+    the file order the streaming writers expect for ``origin="lower"``.
+    """
+    segments = panel_segments(width_m, height_m, res_mm, theme_names, blend_frac, axis)
+    if reverse:
+        segments.reverse()
+    jobs = ((s, render_segment, (s, width_m, height_m, res_mm, axis, None, dtype)) for s in segments)
+    yield from _parallel.imap(jobs, workers, backend)
+
+
+def build_panel(
+    width_m: float,
+    height_m: float,
+    res_mm: float,
+    theme_names: Sequence[str],
+    blend_frac: float,
+    axis: str = "y",
+    out: Optional[np.ndarray] = None,
+    workers: int = 1,
+    backend: str = "process",
+    band_px: int = DEFAULT_TILE_PX,
+    dtype=np.float64,
+) -> np.ndarray:
+    """
+    Return a NumPy image array with smooth transitions.
+
+    axis = 'y' → vertical morph; 'x' → horizontal.  *out* may be any
+    writable ``(rows, cols)`` array (e.g. an ``np.memmap``); segments are
+    rendered in its dtype (*dtype* when allocating).  With
+    ``workers > 1`` every segment is further cut into bands of *band_px*
+    across the blend axis, so the work spreads over many more cores than
+    there are themes.
+    """
+    shape = panel_shape(width_m, height_m, res_mm)
+    if out is None:
+        out = np.empty(shape, dtype)
+    elif out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    width = shape[1] if axis == "y" else shape[0]
+    step = width if workers <= 1 else band_px
+    jobs = []
+    for segment in panel_segments(width_m, height_m, res_mm, theme_names, blend_frac, axis):
+        for lo in range(0, width, step):
+            hi = min(lo + step, width)
+            along, across = slice(segment.start, segment.stop), slice(lo, hi)
+            index = (along, across) if axis == "y" else (across, along)
+            jobs.append((index, render_segment, (segment, width_m, height_m, res_mm, axis, (lo, hi), out.dtype)))
+    return _parallel.fill(out, jobs, workers, backend)
@@ -1,8 +1,23 @@
 """Hexagonal lattice pattern inspired by 2D materials."""
 import numpy as np
 
-def generate(panel_size_m, resolution_mm):
-    px = int(panel_size_m * 1000 / resolution_mm)
-    xx, yy = np.meshgrid(np.arange(px), np.arange(px))
-    pattern = ((xx + yy) % 6 < 3).astype(float)
-    return pattern
+from ._periodic import periodic_window
+from ._window import panel_px
+
+PERIOD = (6, 6)
+
+
+def unit_cell(dtype=np.float64):
+    k = np.arange(6)
+    return ((k[:, None] + k[None, :]) % 6 < 3).astype(dtype)
+
+
+def generate(panel_size_m, resolution_mm, dtype=np.float64, out=None, lazy=False):
+    px = panel_px(panel_size_m, resolution_mm)
+    return generate_window(panel_size_m, resolution_mm, 0, 0, px, px, dtype, out, lazy)
+
+
+def generate_window(panel_size_m, resolution_mm, x0, y0, w, h, dtype=np.float64, out=None,
+                    lazy=False):
+    return periodic_window(unit_cell, PERIOD, panel_size_m, resolution_mm, x0, y0, w, h, dtype, out,
+                           lazy)
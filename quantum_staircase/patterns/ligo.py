@@ -1,10 +1,34 @@
 """Generate sinusoidal interference fringes reminiscent of LIGO arm cavity."""
 import numpy as np
 
-def generate(panel_size_m, resolution_mm):
-    px = int(panel_size_m * 1000 / resolution_mm)
-    x = np.linspace(0, 10*np.pi, px)
-    y = np.linspace(0, 10*np.pi, px)
-    xx, yy = np.meshgrid(x, y)
-    pattern = 0.5 * (1 + np.cos(xx + yy))
+from ._window import check_window, panel_px, window_buffer
+
+
+def generate(panel_size_m, resolution_mm, dtype=np.float64, out=None):
+    px = panel_px(panel_size_m, resolution_mm)
+    return generate_window(panel_size_m, resolution_mm, 0, 0, px, px, dtype, out)
+
+
+def generate_window(panel_size_m, resolution_mm, x0, y0, w, h, dtype=np.float64, out=None):
+    px = panel_px(panel_size_m, resolution_mm)
+    check_window(px, x0, y0, w, h)
+    pattern = window_buffer(w, h, dtype, out)
+    phase = _phase(px, pattern.dtype)
+    return _fringes(phase[x0:x0 + w], phase[y0:y0 + h], pattern)
+
+
+def generate_samples(panel_size_m, resolution_mm, rows, cols, dtype=np.float64):
+    phase = _phase(panel_px(panel_size_m, resolution_mm), dtype)
+    return _fringes(phase[cols], phase[rows], window_buffer(len(cols), len(rows), dtype))
+
+
+def _phase(px, dtype):
+    return np.linspace(0, 10*np.pi, px).astype(dtype)
+
+
+def _fringes(phase_x, phase_y, pattern):
+    np.add(phase_x[None, :], phase_y[:, None], out=pattern)
+    np.cos(pattern, out=pattern)
+    pattern += 1
+    pattern *= 0.5
     return pattern
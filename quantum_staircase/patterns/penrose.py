@@ -4,22 +4,40 @@ quantum_staircase.patterns.penrose  –  overlap-tolerant version
 Changes
 -------
 * validate_polygons called with tol=1e-1  (≃ 0.1 m² overlap allowed)
-* nothing else changed
+* optional ``bbox=(xmin, ymin, xmax, ymax)`` viewport in tiling coordinates:
+  only inflation subtrees reaching it are generated, and ``rasterize`` maps
+  the viewport (instead of the polygon extent) onto the panel, so several
+  panels can be cut from one shared high-level tiling
+* the theme image fills every rhomb (thick/thin shades, dark edges) with the
+  vectorized scanline rasterizer instead of plotting merged-outline vertices
+* outlines are merged with the topological edge-hash merge
+  (:mod:`quantum_staircase.utils.topology`); shapely's ``unary_union`` is
+  only a fallback and an optional cross-check
+* validated outlines are stored in the on-disk cache
+  (:mod:`quantum_staircase.utils.cache`) when one is active
 """
 
 from __future__ import annotations
+from functools import lru_cache
+
 import numpy as np
 from shapely.geometry import Polygon, MultiPolygon
-from shapely.affinity import scale, translate
 from shapely.ops import unary_union
 
 from quantum_staircase.vendor.pynrose_core import PenroseTiling
-from quantum_staircase.utils.validation import validate_polygons
+from quantum_staircase.utils import cache, profiling
+from quantum_staircase.utils.topology import merge_polygons
+from quantum_staircase.utils.validation import _clean_all, validate_polygons
+from quantum_staircase.utils.scanline import fill_polygons, stroke_polygons
+from quantum_staircase.patterns._window import check_window, panel_px, window_buffer
+
+LEVEL = 4
+THICK_VALUE, THIN_VALUE = 1.0, 0.5   # dyadic, so tiled windows sum bit-exactly
+EDGE_MM = 2.0
 
 
-def _merged_polygons(level: int):
-    tiler = PenroseTiling(level)
-    merged = unary_union([Polygon(v).buffer(0) for v in tiler.tile_vertices()])
+def _shapely_union(verts):
+    merged = unary_union(_clean_all(verts, 0.0)[0])
     if isinstance(merged, Polygon):
         merged = [merged]
     elif isinstance(merged, MultiPolygon):
@@ -27,35 +45,134 @@ def _merged_polygons(level: int):
     return [np.asarray(p.exterior.coords[:-1]) for p in merged]
 
 
-def generate_tiles(level: int = 4):
-    polys = _merged_polygons(level)
+def _merged_polygons(level: int, bbox=None, crosscheck: bool = False):
+    """Outlines of the union of all rhombs.
+
+    The tiler's rhombs are edge-to-edge, so the edge-hash merge applies;
+    shapely is the fallback should it refuse them.  ``crosscheck=True``
+    also compares a successful merge against shapely.
+    """
+    with profiling.span("penrose.tiling", level=level):
+        verts, _ = PenroseTiling(level, bbox).tile_array()
+    if not len(verts):
+        return []
+    with profiling.span("penrose.merge", level=level, rhombs=len(verts)):
+        try:
+            polys = merge_polygons(verts)
+        except ValueError:
+            return _shapely_union(verts)
+    if crosscheck:
+        ours = unary_union([Polygon(p) for p in polys])
+        theirs = unary_union([Polygon(p) for p in _shapely_union(verts)])
+        diff = ours.symmetric_difference(theirs)
+        if diff.area > 1e-9 * theirs.area:
+            raise ValueError(f"Edge-hash merge differs from shapely by area {diff.area:.3e}")
+    return polys
+
+
+@profiling.profiled("penrose.generate_tiles")
+def generate_tiles(level: int = 4, bbox=None):
+    params = {"level": level, "bbox": bbox}
+    return cache.cached("penrose.tiles", params, lambda: _validated_tiles(level, bbox))
+
+
+def _validated_tiles(level: int, bbox=None):
+    polys = _merged_polygons(level, bbox)
+    if not polys:
+        return polys
     ok, msg = validate_polygons(polys, tol=1e-1)   # ← relaxed overlap tol
     if not ok:
         raise ValueError(msg)
     return polys
 
 
-def rasterize(polygons, panel_size_m: float, resolution_mm: float):
-    px = int(panel_size_m * 1000 / resolution_mm)
-    img = np.zeros((px, px))
+def _to_pixels(polygons, panel_size_m: float, resolution_mm: float, bbox=None):
+    """Map tiling coordinates to continuous panel pixel coordinates.
 
-    all_xy = np.vstack(polygons)
-    minx, miny = all_xy.min(0)
-    maxx, maxy = all_xy.max(0)
+    Without *bbox* the polygon extent fills the panel; with it the viewport
+    does.  ``(N, k, 2)`` arrays stay arrays, ragged lists stay lists.
+    """
+    ragged = not (isinstance(polygons, np.ndarray) and polygons.ndim == 3)
+    all_xy = np.vstack(polygons) if ragged else polygons.reshape(-1, 2)
+    if bbox is None:
+        minx, miny = all_xy.min(0)
+        maxx, maxy = all_xy.max(0)
+    else:
+        minx, miny, maxx, maxy = bbox
     s = panel_size_m / max(maxx - minx, maxy - miny)
 
-    for coords in polygons:
-        p = Polygon(coords)
-        p = scale(p, xfact=s, yfact=s, origin=(0, 0))
-        p = translate(p, xoff=-minx * s, yoff=-miny * s)
-        xs, ys = p.exterior.coords.xy
-        rr = (np.array(xs) * 1000 / resolution_mm).astype(int)
-        cc = (np.array(ys) * 1000 / resolution_mm).astype(int)
-        rr = np.clip(rr, 0, px - 1)
-        cc = np.clip(cc, 0, px - 1)
-        img[cc, rr] = 1
+    xy = (all_xy * s + np.array([-minx * s, -miny * s])) * 1000 / resolution_mm
+    if not ragged:
+        return xy.reshape(polygons.shape)
+    return np.split(xy, np.cumsum([len(p) for p in polygons])[:-1])
+
+
+def rasterize(polygons, panel_size_m: float, resolution_mm: float, bbox=None, **kwargs):
+    px = panel_px(panel_size_m, resolution_mm)
+    return rasterize_window(polygons, panel_size_m, resolution_mm, 0, 0, px, px, bbox, **kwargs)
+
+
+def rasterize_window(polygons, panel_size_m: float, resolution_mm: float,
+                     x0: int, y0: int, w: int, h: int, bbox=None, *,
+                     values=None, edge_px: float = 0.0, antialias: bool = False):
+    """Pixels ``[y0:y0+h, x0:x0+w]`` of the filled polygons.
+
+    *values* sets each polygon's fill (default 1); overlaps are clipped to the
+    largest value.  ``edge_px > 0`` darkens the outlines with strokes that wide.
+    """
+    px = panel_px(panel_size_m, resolution_mm)
+    check_window(px, x0, y0, w, h)
+    if not len(polygons):
+        return np.zeros((h, w))
+
+    pix = _to_pixels(polygons, panel_size_m, resolution_mm, bbox)
+    opts = dict(window=(x0, y0, w, h), antialias=antialias)
+    img = fill_polygons(pix, (px, px), values=values, **opts)
+    np.minimum(img, 1.0 if values is None else np.max(values), out=img)
+    if edge_px > 0:
+        img *= 1 - stroke_polygons(pix, (px, px), edge_px, **opts)
     return img
 
 
-def generate(panel_size_m: float, resolution_mm: float):
-    return rasterize(generate_tiles(4), panel_size_m, resolution_mm)
+@lru_cache(maxsize=8)
+def _cached_tiling(level: int, bbox=None):
+    return PenroseTiling(level, bbox)
+
+
+def render_tiling(panel_size_m: float, resolution_mm: float, x0: int, y0: int, w: int, h: int,
+                  level: int = LEVEL, bbox=None, antialias: bool = False):
+    """Window of the rhomb tiling: thick/thin fills separated by dark edges."""
+    verts, thick = _cached_tiling(level, bbox).tile_array()
+    with profiling.span("penrose.rasterize", level=level, w=w, h=h):
+        return rasterize_window(
+            verts, panel_size_m, resolution_mm, x0, y0, w, h, bbox,
+            values=np.where(thick, THICK_VALUE, THIN_VALUE),
+            edge_px=EDGE_MM / resolution_mm,
+            antialias=antialias,
+        )
+
+
+def export_svg(outfile, panel_size_m: float, level: int = LEVEL, bbox=None, cmap: str = "viridis",
+               **kwargs):
+    """Stream the rhomb tiling to SVG/SVGZ as the raster theme draws it: thick/thin fills, dark edges."""
+    from quantum_staircase.utils.svg_export import save_svg
+
+    verts, thick = _cached_tiling(level, bbox).tile_array()
+    kwargs.setdefault("stroke_mm", EDGE_MM)
+    save_svg(verts, outfile, panel_size_m, 1.0, cmap, bounds=bbox,
+             values=np.where(thick, THICK_VALUE, THIN_VALUE), **kwargs)
+
+
+def generate(panel_size_m: float, resolution_mm: float, dtype=np.float64, out=None):
+    px = panel_px(panel_size_m, resolution_mm)
+    return generate_window(panel_size_m, resolution_mm, 0, 0, px, px, dtype, out)
+
+
+def generate_window(panel_size_m: float, resolution_mm: float, x0: int, y0: int, w: int, h: int,
+                    dtype=np.float64, out=None):
+    img = render_tiling(panel_size_m, resolution_mm, x0, y0, w, h)
+    if out is None and img.dtype == dtype:
+        return img
+    pattern = window_buffer(w, h, dtype, out)
+    pattern[...] = img
+    return pattern
@@ -1,8 +1,24 @@
 """Surface code checkerboard."""
 import numpy as np
 
-def generate(panel_size_m, resolution_mm):
-    px = int(panel_size_m * 1000 / resolution_mm)
-    xx, yy = np.indices((px, px))
-    pattern = ((xx//20 + yy//20) % 2).astype(float)
-    return pattern
+from ._periodic import periodic_window
+from ._window import panel_px
+
+SQUARE_PX = 20
+PERIOD = (2 * SQUARE_PX, 2 * SQUARE_PX)
+
+
+def unit_cell(dtype=np.float64):
+    parity = np.arange(2 * SQUARE_PX) // SQUARE_PX % 2
+    return (parity[:, None] ^ parity[None, :]).astype(dtype)
+
+
+def generate(panel_size_m, resolution_mm, dtype=np.float64, out=None, lazy=False):
+    px = panel_px(panel_size_m, resolution_mm)
+    return generate_window(panel_size_m, resolution_mm, 0, 0, px, px, dtype, out, lazy)
+
+
+def generate_window(panel_size_m, resolution_mm, x0, y0, w, h, dtype=np.float64, out=None,
+                    lazy=False):
+    return periodic_window(unit_cell, PERIOD, panel_size_m, resolution_mm, x0, y0, w, h, dtype, out,
+                           lazy)
@@ -1,12 +1,36 @@
 """Wigner‑function style pattern for a squeezed state slice."""
 import numpy as np
 
-def generate(panel_size_m, resolution_mm):
-    px = int(panel_size_m * 1000 / resolution_mm)
-    x = np.linspace(-3, 3, px)
-    y = np.linspace(-3, 3, px)
-    xx, yy = np.meshgrid(x, y)
-    r = 0.8  # squeeze parameter
-    pattern = np.exp(- (xx**2 * np.exp(2*r) + yy**2 * np.exp(-2*r)))
-    pattern = (pattern - pattern.min()) / (pattern.max() - pattern.min())
-    return pattern
+from ._window import check_window, normalise, panel_px, window_buffer
+
+R = 0.8  # squeeze parameter
+
+
+def _profiles(px, dtype):
+    """The separable factors ``exp(-x²e^{2r})`` and ``exp(-y²e^{-2r})`` over the panel."""
+    x = np.linspace(-3, 3, px).astype(dtype)
+    return np.exp(-x**2 * np.exp(2*R)).astype(dtype), np.exp(-x**2 * np.exp(-2*R)).astype(dtype)
+
+
+def generate(panel_size_m, resolution_mm, dtype=np.float64, out=None):
+    px = panel_px(panel_size_m, resolution_mm)
+    return generate_window(panel_size_m, resolution_mm, 0, 0, px, px, dtype, out)
+
+
+def generate_window(panel_size_m, resolution_mm, x0, y0, w, h, dtype=np.float64, out=None):
+    px = panel_px(panel_size_m, resolution_mm)
+    check_window(px, x0, y0, w, h)
+    pattern = window_buffer(w, h, dtype, out)
+    fx, fy = _profiles(px, pattern.dtype)
+    return _wigner(fx, fy, slice(x0, x0 + w), slice(y0, y0 + h), pattern)
+
+
+def generate_samples(panel_size_m, resolution_mm, rows, cols, dtype=np.float64):
+    fx, fy = _profiles(panel_px(panel_size_m, resolution_mm), np.dtype(dtype))
+    return _wigner(fx, fy, cols, rows, window_buffer(len(cols), len(rows), dtype))
+
+
+def _wigner(fx, fy, cols, rows, pattern):
+    np.multiply(fy[rows, None], fx[None, cols], out=pattern)
+    # both factors are positive, so the panel extremes are products of theirs
+    return normalise(pattern, fx.min() * fy.min(), fx.max() * fy.max())
@@ -0,0 +1,428 @@
+"""
+Fast previews: progressive renders and a deep-zoom tile pyramid.
+
+Progressive
+    ``quantum-staircase preview --theme amo --outfile amo.png --steps 16 4 1``
+    rewrites *outfile* at ``16×``, ``4×`` and finally full pitch, so an image
+    viewer shows a coarse panel at once and sharpens it.
+
+Pyramid
+    ``quantum-staircase pyramid --theme amo --outdir amo_tiles [--serve]``
+    writes ``z/x/y.png`` tiles plus ``index.html``, a self-contained pan/zoom
+    viewer.  Zoom ``z`` halves the pixel pitch of ``z - 1``; the last level is
+    full resolution, and every coarser tile is the 2 × 2 mean of the four
+    finer tiles below it, assembled incrementally as those finish (only one
+    row of partial tiles per level is held in memory).  With ``--serve``
+    nothing is rendered up front: a local web server renders each tile when
+    the viewer first asks for it — full-resolution tiles exactly (and kept on
+    disk), coarser ones as point-sampled previews — so only the regions
+    someone inspects are ever computed at full resolution.
+
+Tiles are in display orientation: ``y = 0`` is the top of the panel, which
+is the last array row (``origin="lower"``, as the exporters write it).
+
+Preview samples (:func:`sample_pixels`) are exact pixels of the full-pitch
+panel, never a render at a coarser pitch (themes defined in pixel units would
+show a different pattern): periodic themes read their unit cell, themes with
+a ``generate_samples`` hook evaluate only the sampled pixels (radial themes
+their profile at the sampled radii), and any other theme renders the sampled
+rows at full pitch.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from quantum_staircase.patterns import _parallel
+from quantum_staircase.patterns._registry import get_spec, theme_module
+from quantum_staircase.patterns._render import _render_window, get_theme, get_window
+from quantum_staircase.patterns._window import panel_px
+from quantum_staircase.utils import export, raster_export
+
+DEFAULT_STEPS = (16, 4, 1)
+TILE_PX = 256
+PREVIEW_CACHE_BYTES = 64 << 20   # encoded preview tiles a TileServer keeps in memory
+
+
+# ----------------------------------------------------------------------
+# coarse sampling
+# ----------------------------------------------------------------------
+def sample_pixels(name, panel_size_m, resolution_mm, rows, cols, step=1, dtype=np.float64):
+    """Pixels ``full[rows][:, cols]`` of the full-resolution panel, for 1-D index vectors.
+
+    Periodic themes are read from their unit cell, themes with a
+    ``generate_samples(panel_size_m, resolution_mm, rows, cols, dtype)`` hook
+    evaluate just these pixels, and other themes render the bounding window
+    (``step == 1``) or each sampled row (``step > 1``) at full pitch.
+    """
+    rows, cols = np.asarray(rows, np.intp), np.asarray(cols, np.intp)
+    period = get_spec(name).period
+    module = theme_module(name)
+    if period is not None:
+        cell = module.unit_cell(np.dtype(dtype))
+        return cell[np.ix_(rows % period[0], cols % period[1])]
+    if hasattr(module, "generate_samples"):
+        return module.generate_samples(panel_size_m, resolution_mm, rows, cols, dtype)
+    window = get_window(name)
+    c0, w = cols.min(), cols.max() - cols.min() + 1
+    if step == 1:
+        r0, h = rows.min(), rows.max() - rows.min() + 1
+        return np.asarray(window(panel_size_m, resolution_mm, c0, r0, w, h, dtype))[
+            np.ix_(rows - r0, cols - c0)]
+    out = np.empty((len(rows), len(cols)), dtype)
+    for i, r in enumerate(rows):
+        out[i] = np.asarray(window(panel_size_m, resolution_mm, c0, r, w, 1, dtype))[0, cols - c0]
+    return out
+
+
+def iter_progressive(name, panel_size_m, resolution_mm, steps: Sequence[int] = DEFAULT_STEPS,
+                     dtype=np.float64) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yield ``(step, image)`` for each *step*: pixel ``(i, j)`` samples full pixel ``(i·step, j·step)``.
+
+    ``step == 1`` is the ordinary full render.
+    """
+    px = panel_px(panel_size_m, resolution_mm)
+    for step in steps:
+        if step == 1:
+            yield step, np.asarray(get_theme(name)(panel_size_m, resolution_mm, dtype=dtype))
+        else:
+            idx = np.arange(0, px, step)
+            yield step, sample_pixels(name, panel_size_m, resolution_mm, idx, idx, step, dtype)
+
+
+# ----------------------------------------------------------------------
+# pyramid geometry
+# ----------------------------------------------------------------------
+def level_shapes(px, tile_px=TILE_PX) -> List[Tuple[int, int]]:
+    """``(rows, cols)`` of every zoom level, coarsest (one tile) first, full ``px`` last."""
+    if tile_px <= 0 or tile_px % 2:
+        raise ValueError("tile_px must be a positive even number")
+    shapes = [(px, px)]
+    while max(shapes[0]) > tile_px:
+        h, w = shapes[0]
+        shapes.insert(0, (-(-h // 2), -(-w // 2)))
+    return shapes
+
+
+def _tile_span(z, x, y, shapes, tile_px):
+    """Display rows and columns ``(d0, d1, c0, c1)`` of tile ``(z, x, y)`` within its level."""
+    if not 0 <= z < len(shapes):
+        raise KeyError(f"No zoom level {z}")
+    h, w = shapes[z]
+    if not (0 <= x * tile_px < w and 0 <= y * tile_px < h):
+        raise KeyError(f"No tile {z}/{x}/{y}")
+    return y * tile_px, min(h, (y + 1) * tile_px), x * tile_px, min(w, (x + 1) * tile_px)
+
+
+def downsample2(tile):
+    """2 × 2 box mean; an odd last row/column averages the pixels it has."""
+    h, w = tile.shape
+    padded = np.pad(tile, ((0, h % 2), (0, w % 2)), mode="edge")
+    return padded.reshape(-(-h // 2), 2, -(-w // 2), 2).mean(axis=(1, 3))
+
+
+class _Assembler:
+    """Builds every coarser tile from its (up to four) children as they arrive."""
+
+    def __init__(self, shapes, tile_px, emit):
+        self.shapes, self.tile_px, self.emit = shapes, tile_px, emit
+        self.pending = {}
+
+    def _children(self, z, x, y):
+        h, w = self.shapes[z + 1]
+        t = self.tile_px
+        return sum(1 for cy in (2 * y, 2 * y + 1) for cx in (2 * x, 2 * x + 1)
+                   if cy * t < h and cx * t < w)
+
+    def add(self, z, x, y, tile):
+        self.emit(z, x, y, tile)
+        if z == 0:
+            return
+        key = (z - 1, x // 2, y // 2)
+        if key not in self.pending:
+            d0, d1, c0, c1 = _tile_span(*key, self.shapes, self.tile_px)
+            self.pending[key] = [np.empty((d1 - d0, c1 - c0)), self._children(*key)]
+        entry = self.pending[key]
+        half = self.tile_px // 2
+        small = downsample2(tile)
+        r, c = (y % 2) * half, (x % 2) * half
+        entry[0][r:r + small.shape[0], c:c + small.shape[1]] = small
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.pending[key]
+            self.add(*key, entry[0])
+
+
+# ----------------------------------------------------------------------
+# pyramid output
+# ----------------------------------------------------------------------
+_VIEWER = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>html,body{{margin:0;height:100%;background:#222;overflow:hidden}}
+canvas{{display:block;width:100%;height:100%;cursor:grab}}</style></head>
+<body><canvas id="c"></canvas><script>
+const P = {meta};
+const c = document.getElementById("c"), g = c.getContext("2d"), tiles = new Map();
+const Z = P.levels.length - 1, T = P.tile_px, [H, W] = P.levels[Z];
+let scale = 1, ox = 0, oy = 0, drag = null;
+function fit() {{
+  c.width = innerWidth; c.height = innerHeight;
+  scale = Math.min(c.width / W, c.height / H);
+  ox = (c.width - W * scale) / 2; oy = (c.height - H * scale) / 2; draw();
+}}
+function tile(z, x, y) {{
+  const key = z + "/" + x + "/" + y;
+  let im = tiles.get(key);
+  if (!im) {{ im = new Image(); im.onload = draw; im.src = key + ".png"; tiles.set(key, im); }}
+  return im;
+}}
+function drawLevel(z) {{
+  const s = scale * 2 ** (Z - z), [h, w] = P.levels[z], span = T * s;
+  const x0 = Math.max(0, Math.floor(-ox / span)), y0 = Math.max(0, Math.floor(-oy / span));
+  const x1 = Math.min(Math.ceil(w / T), Math.ceil((c.width - ox) / span));
+  const y1 = Math.min(Math.ceil(h / T), Math.ceil((c.height - oy) / span));
+  for (let y = y0; y < y1; y++) for (let x = x0; x < x1; x++) {{
+    const im = tile(z, x, y);
+    if (im.complete && im.naturalWidth)
+      g.drawImage(im, ox + x * span, oy + y * span, im.naturalWidth * s, im.naturalHeight * s);
+  }}
+}}
+function draw() {{
+  g.fillStyle = "#222"; g.fillRect(0, 0, c.width, c.height); g.imageSmoothingEnabled = scale < 1;
+  const z = Math.max(0, Math.min(Z, Z - Math.floor(Math.log2(1 / scale))));
+  for (let zz = 0; zz <= z; zz++) drawLevel(zz);   // coarser levels fill in while finer tiles load
+}}
+c.onwheel = e => {{
+  e.preventDefault();
+  const f = Math.exp(-e.deltaY * 0.002), k = Math.min(16, Math.max(Math.min(c.width / W, c.height / H) / 2, scale * f)) / scale;
+  ox = e.offsetX - (e.offsetX - ox) * k; oy = e.offsetY - (e.offsetY - oy) * k; scale *= k; draw();
+}};
+c.onmousedown = e => {{ drag = [e.offsetX - ox, e.offsetY - oy]; }};
+onmouseup = () => {{ drag = null; }};
+c.onmousemove = e => {{ if (drag) {{ ox = e.offsetX - drag[0]; oy = e.offsetY - drag[1]; draw(); }} }};
+onresize = fit; fit();
+</script></body></html>
+"""
+
+
+def _tile_path(outdir, z, x, y):
+    return Path(outdir) / str(z) / str(x) / f"{y}.png"
+
+
+def _write_tile(path, tile, resolution_mm, cmap):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}")
+    raster_export.write_png(tile, tmp, resolution_mm, cmap=cmap, origin="upper")
+    os.replace(tmp, path)
+
+
+def _write_meta(outdir, name, panel_size_m, resolution_mm, shapes, tile_px):
+    meta = {"theme": name, "panel_size_m": panel_size_m, "resolution_mm": resolution_mm,
+            "tile_px": tile_px, "levels": shapes}
+    outdir.mkdir(parents=True, exist_ok=True)
+    (outdir / "pyramid.json").write_text(json.dumps(meta, indent=1))
+    (outdir / "index.html").write_text(_VIEWER.format(title=f"{name} {panel_size_m:g} m",
+                                                      meta=json.dumps(meta)))
+    return meta
+
+
+def _full_res_jobs(name, panel_size_m, resolution_mm, shapes, tile_px, dtype):
+    """Render jobs for the full-resolution level, display row by display row."""
+    z = len(shapes) - 1
+    px = shapes[z][0]
+    for y in range(-(-px // tile_px)):
+        for x in range(-(-px // tile_px)):
+            d0, d1, c0, c1 = _tile_span(z, x, y, shapes, tile_px)
+            args = (name, panel_size_m, resolution_mm, c0, px - d1, c1 - c0, d1 - d0, dtype)
+            yield (x, y), _render_window, args
+
+
+def iter_pyramid(name, panel_size_m, resolution_mm, tile_px=TILE_PX, workers=1, backend="thread",
+                 dtype=np.float64) -> Iterator[Tuple[int, int, int, np.ndarray]]:
+    """Yield ``(z, x, y, pixels)`` for every tile, each coarser tile as soon as its children are done."""
+    shapes = level_shapes(panel_px(panel_size_m, resolution_mm), tile_px)
+    zmax = len(shapes) - 1
+    ready = []
+    assembler = _Assembler(shapes, tile_px, lambda *tile: ready.append(tile))
+    jobs = _full_res_jobs(name, panel_size_m, resolution_mm, shapes, tile_px, dtype)
+    for (x, y), tile in _parallel.imap(jobs, workers, backend):
+        assembler.add(zmax, x, y, np.asarray(tile)[::-1])
+        yield from ready
+        ready.clear()
+
+
+def write_pyramid(name, panel_size_m, resolution_mm, outdir, tile_px=TILE_PX, cmap="viridis",
+                  workers=1, backend="thread", dtype=np.float64):
+    """Render the full pyramid of theme *name* into *outdir*; returns the level shapes."""
+    outdir = Path(outdir)
+    shapes = level_shapes(panel_px(panel_size_m, resolution_mm), tile_px)
+    _write_meta(outdir, name, panel_size_m, resolution_mm, shapes, tile_px)
+    zmax = len(shapes) - 1
+    for z, x, y, tile in iter_pyramid(name, panel_size_m, resolution_mm, tile_px, workers, backend,
+                                      dtype):
+        _write_tile(_tile_path(outdir, z, x, y), tile, resolution_mm * 2 ** (zmax - z), cmap)
+    return shapes
+
+
+class TileServer:
+    """Renders pyramid tiles on demand: exact at full resolution, sampled previews above.
+
+    Full-resolution tiles and any tile already on disk (e.g. from
+    :func:`write_pyramid`) are served from *outdir*; previews are kept in
+    memory only, the most recently served first, up to *cache_bytes* of PNG.
+    """
+
+    def __init__(self, name, panel_size_m, resolution_mm, outdir, tile_px=TILE_PX,
+                 cmap="viridis", dtype=np.float64, cache_bytes=PREVIEW_CACHE_BYTES):
+        self.name, self.size, self.res = name, panel_size_m, resolution_mm
+        self.outdir, self.tile_px, self.cmap, self.dtype = Path(outdir), tile_px, cmap, dtype
+        self.px = panel_px(panel_size_m, resolution_mm)
+        self.shapes = level_shapes(self.px, tile_px)
+        self.meta = _write_meta(self.outdir, name, panel_size_m, resolution_mm, self.shapes, tile_px)
+        self.previews = OrderedDict()
+        self.cache_bytes, self._cached_bytes = cache_bytes, 0
+        self._lock = threading.Lock()
+
+    def pixels(self, z, x, y):
+        """Float pixels of tile ``(z, x, y)`` in display orientation."""
+        d0, d1, c0, c1 = _tile_span(z, x, y, self.shapes, self.tile_px)
+        step = 2 ** (len(self.shapes) - 1 - z)
+        if step == 1:
+            tile = get_window(self.name)(self.size, self.res, c0, self.px - d1, c1 - c0, d1 - d0,
+                                         self.dtype)
+            return np.asarray(tile)[::-1]
+        rows = self.px - 1 - step * np.arange(d0, d1)
+        cols = step * np.arange(c0, c1)
+        return sample_pixels(self.name, self.size, self.res, rows, cols, step, self.dtype)
+
+    def png(self, z, x, y) -> bytes:
+        path = _tile_path(self.outdir, z, x, y)
+        if path.exists():
+            return path.read_bytes()
+        key = (z, x, y)
+        with self._lock:
+            if key in self.previews:
+                self.previews.move_to_end(key)
+                return self.previews[key]
+        step = 2 ** (len(self.shapes) - 1 - z)
+        tile = self.pixels(z, x, y)
+        if step == 1:
+            _write_tile(path, tile, self.res, self.cmap)
+            return path.read_bytes()
+        buf = io.BytesIO()
+        raster_export.write_png(tile, buf, self.res * step, cmap=self.cmap, origin="upper")
+        body = buf.getvalue()
+        with self._lock:
+            if key not in self.previews:
+                self.previews[key] = body
+                self._cached_bytes += len(body)
+            while self._cached_bytes > self.cache_bytes and self.previews:
+                self._cached_bytes -= len(self.previews.popitem(last=False)[1])
+        return body
+
+    def serve(self, port=8000, host="127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = self.path.split("?")[0].strip("/").split("/")
+                try:
+                    if parts in ([""], ["index.html"]):
+                        body, kind = (server.outdir / "index.html").read_bytes(), "text/html"
+                    elif len(parts) == 3 and parts[2].endswith(".png"):
+                        z, x, y = int(parts[0]), int(parts[1]), int(parts[2][:-4])
+                        body, kind = server.png(z, x, y), "image/png"
+                    else:
+                        raise KeyError(self.path)
+                except (KeyError, ValueError):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        httpd = ThreadingHTTPServer((host, port), Handler)
+        print(f"Serving {self.name} tiles on http://{host}:{httpd.server_port}/  (Ctrl-C to stop)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            httpd.server_close()
+
+
+# ----------------------------------------------------------------------
+# command line
+# ----------------------------------------------------------------------
+def _common(parser):
+    from quantum_staircase import patterns
+
+    parser.add_argument("--theme", required=True, choices=patterns.list_themes(), help="Pattern theme")
+    parser.add_argument("--panel-size-m", type=float, default=3.0, help="Panel size in metres (square)")
+    parser.add_argument("--resolution-mm", type=float, default=1.0, help="Full pixel resolution in mm")
+    parser.add_argument("--dtype", choices=("float64", "float32"), default="float64")
+
+
+def main(argv=None):
+    """``quantum-staircase preview``: progressively refined renders of one panel."""
+    parser = argparse.ArgumentParser(prog="quantum-staircase preview",
+                                     description="Render a coarse preview and refine it in place")
+    _common(parser)
+    parser.add_argument("--outfile", required=True, help="Image rewritten after every step")
+    parser.add_argument("--steps", type=int, nargs="+", default=list(DEFAULT_STEPS),
+                        help="Pixel-pitch multiples, coarse to fine (1 = full resolution)")
+    args = parser.parse_args(argv)
+
+    out = Path(args.outfile)
+    tmp = out.with_name(f".{out.stem}.partial{out.suffix}")
+    t0 = time.perf_counter()
+    for step, img in iter_progressive(args.theme, args.panel_size_m, args.resolution_mm,
+                                      args.steps, args.dtype):
+        export.save_image(img, tmp, args.panel_size_m, args.resolution_mm * step)
+        os.replace(tmp, out)
+        print(f"{step:4d}×  {img.shape[1]}×{img.shape[0]} px  after {time.perf_counter() - t0:.2f} s")
+    return 0
+
+
+def pyramid_main(argv=None):
+    """``quantum-staircase pyramid``: write (or serve on demand) a deep-zoom tile pyramid."""
+    parser = argparse.ArgumentParser(prog="quantum-staircase pyramid",
+                                     description="Deep-zoom z/x/y PNG tiles and an HTML viewer")
+    _common(parser)
+    parser.add_argument("--outdir", required=True, help="Tile directory (index.html goes here)")
+    parser.add_argument("--tile-px", type=int, default=TILE_PX, help="Tile edge in pixels (even)")
+    parser.add_argument("--cmap", default="viridis")
+    parser.add_argument("--workers", type=int, default=1, help="Render full-resolution tiles on this many cores")
+    parser.add_argument("--serve", action="store_true",
+                        help="Render tiles lazily behind a local web server instead of all up front")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        TileServer(args.theme, args.panel_size_m, args.resolution_mm, args.outdir, args.tile_px,
+                   args.cmap, args.dtype).serve(args.port)
+        return 0
+    t0 = time.perf_counter()
+    shapes = write_pyramid(args.theme, args.panel_size_m, args.resolution_mm, args.outdir,
+                           args.tile_px, args.cmap, args.workers, dtype=args.dtype)
+    tiles = sum(math.ceil(h / args.tile_px) * math.ceil(w / args.tile_px) for h, w in shapes)
+    print(f"Wrote {tiles} tiles in {len(shapes)} levels to {Path(args.outdir).resolve()} "
+          f"({time.perf_counter() - t0:.1f} s); open index.html")
+    return 0
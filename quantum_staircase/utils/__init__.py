@@ -1,2 +1,15 @@
-from . import geometry, validation, export
-from . import svg_export      # new
+"""Geometry, validation, caching and export helpers, imported on first use.
+
+``utils.export`` & co. resolve lazily so that importing the package (e.g. for
+the CLI's ``--help``) does not pull in matplotlib, shapely or scipy.
+"""
+from importlib import import_module
+
+__all__ = ["cache", "export", "geometry", "pipeline", "profiling", "raster_export", "scanline",
+           "svg_export", "topology", "validation"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
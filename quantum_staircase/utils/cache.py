@@ -0,0 +1,200 @@
+"""
+Persistent, content-addressed on-disk cache for tilings and theme renders.
+
+Entries are keyed on ``(theme, params, window)`` plus the package version,
+hashed to a file name, so unchanged renders are found again across runs and
+processes and any release invalidates the lot.
+
+Storage
+-------
+* a single array           → ``<key>.npy``, loaded back as a copy-on-write
+  ``np.memmap`` (callers may scribble on it, the file stays intact);
+* a list of 2-D arrays     → ``<key>.npz`` holding the concatenated vertices
+  and each polygon's end offset (ragged polygon lists).
+
+Every hit refreshes the file's mtime.  Each cache keeps a running byte
+total of its entries; only when a write takes it over ``max_bytes`` is the
+directory rescanned and the oldest files evicted until it is back under.
+
+The active cache is off until :func:`set_cache` is called or the
+``QUANTUM_STAIRCASE_CACHE_DIR`` environment variable is set
+(``QUANTUM_STAIRCASE_CACHE_MB`` bounds its size).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from quantum_staircase import __version__
+
+DEFAULT_MAX_BYTES = 2 << 30
+_SUFFIXES = (".npy", ".npz")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+def _canonical(obj):
+    """JSON-able, order-independent form of a parameter structure."""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in sorted(obj.items())}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, float):
+        return repr(obj)   # keeps 1.0 and 1 distinct from ints, exactly
+    return obj
+
+
+class DiskCache:
+    """Size-bounded LRU cache of NumPy results in *directory*."""
+
+    def __init__(self, directory, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.stats = CacheStats()
+        self._bytes: Optional[int] = None   # running total, scanned on the first write
+
+    @staticmethod
+    def key(theme: str, params=None, window=None) -> str:
+        blob = json.dumps(_canonical([__version__, theme, params or {}, window]))
+        return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+    def _path(self, key):
+        for suffix in _SUFFIXES:
+            path = self.directory / (key + suffix)
+            if path.exists():
+                return path
+        return None
+
+    def get(self, key):
+        """Cached value for *key*, or ``None`` on a miss."""
+        path = self._path(key)
+        if path is None:
+            self.stats.misses += 1
+            return None
+        try:
+            if path.suffix == ".npy":
+                value = np.load(path, mmap_mode="c")
+            else:
+                with np.load(path) as npz:
+                    ends = npz["ends"]
+                    value = np.split(npz["verts"], ends[:-1]) if len(ends) else []
+            os.utime(path)
+        except (OSError, ValueError):   # evicted by another process or torn
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store *value* (array or list of arrays) under *key*; returns *value*."""
+        if isinstance(value, np.ndarray):
+            suffix, save = ".npy", lambda f: np.save(f, value)
+        else:
+            parts = [np.asarray(v) for v in value]
+            verts = np.concatenate(parts) if parts else np.empty((0, 2))
+            ends = np.cumsum([len(p) for p in parts], dtype=np.int64)
+            suffix, save = ".npz", lambda f: np.savez(f, verts=verts, ends=ends)
+        old = self._path(key)
+        try:
+            replaced = old.stat().st_size if old is not None else 0
+        except OSError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(suffix=suffix, dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                save(f)
+                written = f.tell()
+            os.replace(tmp, self.directory / (key + suffix))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        if old is not None and old.suffix != suffix:
+            old.unlink(missing_ok=True)
+        if self._bytes is None:
+            self._bytes = self.size()
+        else:
+            self._bytes += written - replaced
+        if self._bytes > self.max_bytes:
+            self.evict()
+        return value
+
+    def fetch(self, theme: str, params, compute: Callable, window=None):
+        """``compute()``, unless the same ``(theme, params, window)`` is cached."""
+        key = self.key(theme, params, window)
+        value = self.get(key)
+        return self.put(key, compute()) if value is None else value
+
+    def _entries(self):
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix in _SUFFIXES and not path.name.startswith("tmp"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return sorted(entries)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_bytes: Optional[int] = None):
+        """Delete least-recently-used entries until under *max_bytes*."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.stats.evictions += 1
+        self._bytes = total
+
+    def clear(self):
+        self.evict(0)
+
+
+_active: Optional[DiskCache] = None
+if os.environ.get("QUANTUM_STAIRCASE_CACHE_DIR"):
+    _active = DiskCache(
+        os.environ["QUANTUM_STAIRCASE_CACHE_DIR"],
+        int(float(os.environ.get("QUANTUM_STAIRCASE_CACHE_MB", DEFAULT_MAX_BYTES >> 20)) * (1 << 20)),
+    )
+
+
+def set_cache(directory=None, max_bytes: int = DEFAULT_MAX_BYTES) -> Optional[DiskCache]:
+    """Activate a cache in *directory* (``None`` switches caching off)."""
+    global _active
+    _active = None if directory is None else DiskCache(directory, max_bytes)
+    return _active
+
+
+def get_cache() -> Optional[DiskCache]:
+    return _active
+
+
+def cached(theme: str, params, compute: Callable, window=None):
+    """``compute()`` through the active cache, or directly if there is none."""
+    if _active is None:
+        return compute()
+    return _active.fetch(theme, params, compute, window)
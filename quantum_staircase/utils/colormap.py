@@ -0,0 +1,104 @@
+"""
+Shared colour pipeline: colormap lookup tables and vectorized quantization.
+
+Every exporter maps float pixels the same way — linearly from
+``vmin``‒``vmax`` onto integer levels, then (for colour output) through a
+lookup table sampled once from a matplotlib colormap:
+
+* :func:`colormap_lut` builds (and caches) a 2‒65536-entry RGB/RGBA table;
+* :func:`quantize` turns a float array into ``uint8``/``uint16`` levels in
+  chunks of rows, so the float temporaries stay small however large the
+  input, optionally with ordered (Bayer) dithering;
+* :func:`apply_colormap` chains the two into RGB(A) pixels.
+
+Dithering replaces rounding with a threshold from an 8 × 8 Bayer matrix tiled
+over the image, trading banding for fine noise.  The matrix is anchored at
+image pixel ``(row0, 0)``, so strips quantized separately with their row
+offsets join seamlessly.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+
+MAX_LUT = 1 << 16
+CHUNK_PIXELS = 1 << 20      # float temporaries of ~8 MB per chunk
+
+
+def _bayer(n):
+    m = np.zeros((1, 1))
+    while m.shape[0] < n:
+        m = np.block([[4 * m, 4 * m + 2], [4 * m + 3, 4 * m + 1]])
+    return m
+
+
+BAYER = (_bayer(8) + 0.5) / 64       # thresholds in (0, 1), mean 0.5
+
+
+@lru_cache(maxsize=32)
+def _lut(cmap, n, alpha):
+    from matplotlib import colormaps
+
+    rgba = colormaps[cmap](np.linspace(0, 1, n))
+    lut = np.rint(rgba[:, :4 if alpha else 3] * 255).astype(np.uint8)   # contiguous: fast gathers
+    lut.flags.writeable = False
+    return lut
+
+
+def colormap_lut(cmap, n=256, alpha=False):
+    """``(n, 3)`` (or ``(n, 4)`` with *alpha*) uint8 table sampled evenly from a matplotlib colormap.
+
+    Tables are cached and read-only.
+    """
+    if not 2 <= n <= MAX_LUT:
+        raise ValueError(f"LUT size must be between 2 and {MAX_LUT}, not {n}")
+    return _lut(cmap, n, bool(alpha))
+
+
+def level_dtype(maxval):
+    return np.dtype(np.uint8) if maxval < 256 else np.dtype(np.uint16)
+
+
+def quantize(data, vmin, vmax, maxval, dtype=None, *, dither=False, row0=0, out=None,
+             chunk_rows=None):
+    """Map ``vmin``‒``vmax`` linearly onto integer levels ``0``‒``maxval``.
+
+    Values are rounded to the nearest level, or thresholded against the
+    Bayer matrix with *dither* (anchored at image row *row0*).  The pass
+    runs over *chunk_rows* rows at a time (about :data:`CHUNK_PIXELS` pixels
+    by default) and writes into *out* if given.  An empty range
+    (``vmax == vmin``, e.g. a constant panel) maps everything to level 0.
+    """
+    data = np.asarray(data)
+    dtype = np.dtype(dtype or level_dtype(maxval))
+    if out is None:
+        out = np.empty(data.shape, dtype)
+    if data.size == 0:
+        return out
+    rows = data.shape[0] if data.ndim else 1
+    width = max(1, data.size // rows)
+    step = chunk_rows or max(1, CHUNK_PIXELS // width)
+    scale = maxval / (vmax - vmin) if vmax != vmin else 0.0
+    flat_in, flat_out = data.reshape(rows, -1), out.reshape(rows, -1)
+    for top in range(0, rows, step):
+        scaled = np.subtract(flat_in[top:top + step], vmin, dtype=float)
+        scaled *= scale
+        if dither:
+            n = BAYER.shape[0]
+            r = (np.arange(top, top + scaled.shape[0]) + row0) % n
+            c = np.arange(scaled.shape[1]) % n
+            scaled += BAYER[r[:, None], c[None, :]]
+            np.floor(scaled, out=scaled)
+        else:
+            np.rint(scaled, out=scaled)
+        np.clip(scaled, 0, maxval, out=scaled)
+        flat_out[top:top + step] = scaled
+    return out
+
+
+def apply_colormap(data, cmap="viridis", vmin=0.0, vmax=1.0, n=256, alpha=False, **kwargs):
+    """RGB(A) uint8 pixels of *data* through an *n*-entry LUT; keywords as :func:`quantize`."""
+    levels = quantize(data, vmin, vmax, n - 1, **kwargs)
+    return colormap_lut(cmap, n, alpha)[levels]
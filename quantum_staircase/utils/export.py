@@ -1,12 +1,36 @@
-"""Export helpers using matplotlib."""
-import matplotlib.pyplot as plt
+"""Export helpers: native streaming PNG/TIFF, matplotlib for other formats."""
+from pathlib import Path
+
 import numpy as np
 
-def save_image(arr, outfile, panel_size_m, resolution_mm):
+from . import raster_export
+from .colormap import apply_colormap
+from .profiling import profiled, span
+
+@profiled("export.save_image")
+def save_image(arr, outfile, panel_size_m, resolution_mm, **kwargs):
+    """Write *arr* (or an iterable of row strips) as an image.
+
+    ``.png``/``.tif``/``.tiff`` go through :mod:`raster_export` pixel for pixel;
+    keyword arguments (``mode``, ``cmap``, ``vmin``/``vmax``, ``shape`` …) are
+    passed on.  Any other suffix is rendered by matplotlib.
+    """
+    if Path(outfile).suffix.lower() in raster_export.SUFFIXES:
+        raster_export.save_raster(arr, outfile, resolution_mm, **kwargs)
+        return
+    _save_matplotlib(arr, outfile, panel_size_m, resolution_mm)
+
+def _save_matplotlib(arr, outfile, panel_size_m, resolution_mm):
+    import matplotlib.pyplot as plt
+
     dpi = 1000 / resolution_mm  # 1 mm per pixel ⇒ 1000 mm per metre
     figsize = (panel_size_m, panel_size_m)
     fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
-    ax.imshow(arr, extent=[0, panel_size_m, 0, panel_size_m], origin="lower")
+    # colour once through the shared LUT, scaled to the data range as imshow would
+    arr = np.asarray(arr)
+    rgb = apply_colormap(arr, "viridis", arr.min(), arr.max())
+    ax.imshow(rgb, extent=[0, panel_size_m, 0, panel_size_m], origin="lower")
     ax.set_axis_off()
-    fig.savefig(outfile, bbox_inches="tight", pad_inches=0)
+    with span("matplotlib.savefig"):
+        fig.savefig(outfile, bbox_inches="tight", pad_inches=0)
     plt.close(fig)
@@ -0,0 +1,93 @@
+"""
+Overlapped generate → encode → write execution for the streaming exporters.
+
+:func:`run` drives three stages at once:
+
+generate  the source iterable (e.g. ``patterns.iter_strips``) is pulled on a
+          background thread
+encode    each item is encoded (quantize, colour, deflate) on a pool of
+          *workers* threads — zlib and most large NumPy kernels release the
+          GIL, so the encoders run truly in parallel
+write     results are written in order on the calling thread
+
+Bounded queues between the stages give backpressure: at most *depth* items
+are generated ahead and ``workers + depth`` are being encoded, so memory stays
+a few strips no matter how fast one stage is, and wall time approaches that
+of the slowest stage rather than the sum of all three.  An exception in any
+stage stops the others and is re-raised in the caller.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+_DONE = object()
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def prefetch(iterable: Iterable, depth: int = 2) -> Iterator:
+    """Iterate *iterable* on a background thread, at most *depth* items ahead."""
+    q = queue.Queue(max(1, depth))
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                if not _put(q, (True, item), stop):
+                    return
+            _put(q, (True, _DONE), stop)
+        except BaseException as exc:   # handed to the consumer
+            _put(q, (False, exc), stop)
+
+    thread = threading.Thread(target=produce, name="pipeline-generate", daemon=True)
+    thread.start()
+    try:
+        while True:
+            ok, item = q.get()
+            if not ok:
+                raise item
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def imap_ordered(fn: Callable, iterable: Iterable, workers: int = 2,
+                 depth: Optional[int] = None) -> Iterator:
+    """``fn(item)`` for each item on *workers* threads, yielded in input order."""
+    depth = workers if depth is None else depth
+    with ThreadPoolExecutor(workers, thread_name_prefix="pipeline-encode") as pool:
+        pending = deque()
+        try:
+            for item in iterable:
+                pending.append(pool.submit(fn, item))
+                if len(pending) > workers + depth:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def run(items: Iterable, encode: Callable, write: Callable, workers: int = 2,
+        depth: Optional[int] = None):
+    """``write(encode(item))`` for every item, the three stages overlapped (see module doc)."""
+    depth = workers if depth is None else depth
+    for result in imap_ordered(encode, prefetch(items, depth), workers, depth):
+        write(result)
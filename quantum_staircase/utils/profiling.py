@@ -0,0 +1,194 @@
+"""
+Opt-in timing and memory telemetry for render jobs.
+
+    from quantum_staircase.utils import profiling
+
+    with profiling.profile() as prof:
+        ...                                   # render, validate, export
+    prof.write_trace("profile.json")          # chrome://tracing or ui.perfetto.dev
+    print(prof.summary())
+
+Instrumented stages (theme windows, Penrose merge and validation, encoding,
+compression and the exporters) run inside :func:`span`.  While a
+:class:`Profiler` is active, every finished span becomes a :class:`Span`
+record holding its wall time and the process's peak RSS at exit (plus how
+much the span raised it, i.e. whether it set a new memory high-water mark).
+Hooks registered with :meth:`Profiler.add_hook` receive each record as it
+finishes, so a job runner can forward metrics without keeping them
+(``keep=False``).
+
+Spans in worker threads are recorded with their thread id; spans inside
+process-pool workers are not collected.  With no active profiler
+:func:`span` returns a shared no-op context: the cost is a global lookup.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NULL = nullcontext()
+_active: Optional["Profiler"] = None
+
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MiB (``None`` if unknown)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024  # bytes vs KiB
+
+
+class Span(NamedTuple):
+    name: str
+    start: float           # seconds since the profiler started
+    seconds: float
+    max_rss_mb: Optional[float]
+    rss_growth_mb: Optional[float]
+    thread: int
+    args: dict
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "args", "t0", "rss0")
+
+    def __init__(self, profiler, name, args):
+        self.profiler, self.name, self.args = profiler, name, args
+
+    def __enter__(self):
+        self.rss0 = max_rss_mb()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter()
+        rss = max_rss_mb()
+        growth = None if rss is None else rss - self.rss0
+        self.profiler._emit(Span(self.name, self.t0 - self.profiler.t0, t1 - self.t0,
+                                 rss, growth, threading.get_ident(), self.args))
+        return False
+
+
+class Profiler:
+    """Collects :class:`Span` records and passes them to hooks."""
+
+    def __init__(self, hooks=(), keep: bool = True):
+        self.t0 = time.perf_counter()
+        self.keep = keep
+        self.spans: List[Span] = []
+        self.hooks: List[Callable[[Span], None]] = list(hooks)
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[Span], None]):
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def _emit(self, record: Span):
+        if self.keep:
+            with self._lock:
+                self.spans.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def span(self, name: str, **args):
+        return _Timer(self, name, args)
+
+    def summary(self):
+        """``{name: {"calls", "seconds", "max_rss_mb"}}`` over the kept spans."""
+        out = {}
+        for s in self.spans:
+            row = out.setdefault(s.name, {"calls": 0, "seconds": 0.0, "max_rss_mb": None})
+            row["calls"] += 1
+            row["seconds"] += s.seconds
+            if s.max_rss_mb is not None:
+                row["max_rss_mb"] = max(row["max_rss_mb"] or 0.0, s.max_rss_mb)
+        return out
+
+    def trace_events(self):
+        """Chrome trace-event list: one complete (``"X"``) event per span, RSS as a counter."""
+        pid = os.getpid()
+        events = []
+        for s in self.spans:
+            ts = s.start * 1e6
+            args = {k: v if isinstance(v, (int, float, str, bool, type(None))) else repr(v)
+                    for k, v in s.args.items()}
+            if s.max_rss_mb is not None:
+                args.update(max_rss_mb=round(s.max_rss_mb, 3), rss_growth_mb=round(s.rss_growth_mb, 3))
+                events.append({"name": "max_rss_mb", "ph": "C", "ts": ts + s.seconds * 1e6,
+                               "pid": pid, "args": {"MiB": round(s.max_rss_mb, 3)}})
+            events.append({"name": s.name, "cat": s.name.split(".")[0], "ph": "X", "ts": ts,
+                           "dur": s.seconds * 1e6, "pid": pid, "tid": s.thread, "args": args})
+        return events
+
+    def write_trace(self, outfile):
+        """Write the spans as Chrome trace-event JSON."""
+        trace = {"traceEvents": self.trace_events(), "displayTimeUnit": "ms",
+                 "otherData": {"summary": self.summary()}}
+        Path(outfile).write_text(json.dumps(trace))
+
+
+def enable(*hooks, keep: bool = True) -> Profiler:
+    """Start collecting spans process-wide (replacing any active profiler)."""
+    global _active
+    _active = Profiler(hooks, keep)
+    return _active
+
+
+def disable() -> Optional[Profiler]:
+    """Stop collecting; returns the profiler that was active."""
+    global _active
+    prof, _active = _active, None
+    return prof
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _active
+
+
+@contextmanager
+def profile(*hooks, keep: bool = True):
+    """Profile the ``with`` block, restoring the previously active profiler after."""
+    global _active
+    previous = _active
+    prof = enable(*hooks, keep=keep)
+    try:
+        yield prof
+    finally:
+        _active = previous
+
+
+def span(name: str, **args):
+    """Context timing one stage under the active profiler (no-op when there is none)."""
+    prof = _active
+    if prof is None:
+        return _NULL
+    return prof.span(name, **args)
+
+
+def profiled(name: str):
+    """Decorator wrapping every call of the function in ``span(name)``."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            prof = _active
+            if prof is None:
+                return fn(*args, **kwargs)
+            with prof.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
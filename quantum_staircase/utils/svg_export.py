@@ -11,89 +11,241 @@ remains crisp at any zoom level.
 
 Requirements
 ------------
-pip install svgwrite numpy matplotlib
+pip install numpy matplotlib
 
 Public helpers
 --------------
 save_svg(arr_or_polys, outfile, panel_size_m, resolution_mm, cmap="viridis")
 
-* If *arr_or_polys* is a NumPy 2-D array   → draws coloured rects
-* If it is a list of polygons (Nx2 ndarray) → draws filled paths
+* If *arr_or_polys* is a NumPy 2-D array   → raster mode (see below)
+* If it is a list of polygons (Nx2 ndarray) or an ``(N, k, 2)`` array
+  (e.g. ``PenroseTiling.tile_array()``)    → filled paths (see below)
+
+Raster modes
+------------
+"spans"  quantize to *levels* colours and merge equal-level pixels into
+         rectangles (row runs extended down identical rows); one compound
+         ``<path>`` per colour per band of rows.  Element count and file
+         size follow the pattern's edges, not its pixel count.
+"image"  embed the bitmap as base64 PNG tiles (``<image>`` per tile).
+
+Polygons
+--------
+Polygons are written straight to the file in batches, without an SVG DOM:
+each batch becomes one compound ``<path>`` per fill colour, with vertices
+quantized to integers of ``precision_mm`` in a scaled viewBox (an absolute
+move, then relative lines).  The extent (or *bounds*) fills the panel with
+y pointing up, matching the raster exports.
+
+Bitmaps are streamed to disk one band of rows at a time; row-strip
+iterables are accepted with ``shape=(rows, cols)`` as for
+:mod:`quantum_staircase.utils.raster_export`.  A ``.svgz`` suffix writes
+gzip-compressed SVG.
 """
 
 from __future__ import annotations
 
+import base64
+import gzip
+import io
+from functools import partial
+from pathlib import Path
 from typing import Sequence, Union
 
 import numpy as np
-import svgwrite
-from matplotlib import cm
-
-
-def _rgba(color):
-    r, g, b, a = color
-    return f"rgba({int(r*255)},{int(g*255)},{int(b*255)},{a:.3f})"
-
-
-def _export_bitmap(arr: np.ndarray, dwg, size_px, cmap):
-    h, w = arr.shape
-    colormap = cm.get_cmap(cmap)
-    pixel_w = size_px[0] / w
-    pixel_h = size_px[1] / h
-    for y in range(h):
-        for x in range(w):
-            c = colormap(arr[y, x])
-            dwg.add(
-                dwg.rect(
-                    insert=(x * pixel_w, size_px[1] - (y + 1) * pixel_h),
-                    size=(pixel_w, pixel_h),
-                    fill=_rgba(c),
-                    stroke="none",
-                )
-            )
-
-
-def _export_polygons(polys: Sequence[np.ndarray], dwg, scale, cmap):
-    colormap = cm.get_cmap(cmap)
-    for i, poly in enumerate(polys):
-        color = _rgba(colormap(i / len(polys)))
-        path_data = [(poly[0][0] * scale, poly[0][1] * scale)]
-        for x, y in poly[1:]:
-            path_data.append((x * scale, y * scale))
-        dwg.add(
-            dwg.polygon(
-                points=path_data,
-                fill=color,
-                stroke="none",
-            )
-        )
+
+from .colormap import colormap_lut, quantize
+from .geometry import group_by_size
+from .profiling import profiled, span
+from .raster_export import _iter_strips, _numbered, _run, _source_shape, write_png
+
+RASTER_MODES = ("spans", "image")
+
+
+def _hex(rgb):
+    return "#%02x%02x%02x" % tuple(rgb)
 
 
+def _open_text(outfile):
+    if Path(outfile).suffix.lower() == ".svgz":
+        return gzip.open(outfile, "wt", compresslevel=6, encoding="utf-8")
+    return open(outfile, "w", encoding="utf-8")
+
+
+# ----------------------------------------------------------------------
+# bitmaps
+# ----------------------------------------------------------------------
+def _span_rects(q: np.ndarray):
+    """Yield ``(level, x, y, w, h)`` rectangles covering *q* (rows top first).
+
+    Each row is split into runs of equal level; a run that reappears with the
+    same extent and level in the next row grows its rectangle downwards.
+    """
+    open_runs = {}  # (x0, x1, level) -> first row
+    prev = None
+    for y, row in enumerate(q):
+        if prev is not None and np.array_equal(row, prev):
+            continue
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(row)) + 1))
+        ends = np.append(starts[1:], row.size)
+        runs = set(zip(starts.tolist(), ends.tolist(), row[starts].tolist()))
+        for key in [k for k in open_runs if k not in runs]:
+            x0, x1, level = key
+            y0 = open_runs.pop(key)
+            yield level, x0, y0, x1 - x0, y - y0
+        for key in runs:
+            open_runs.setdefault(key, y)
+        prev = row
+    for (x0, x1, level), y0 in open_runs.items():
+        yield level, x0, y0, x1 - x0, len(q) - y0
+
+
+def _spans_text(colors, levels, item):
+    top, strip = item
+    with span("svg.quantize", rows=strip.shape[0]):
+        q = quantize(strip, 0.0, 1.0, levels - 1, np.uint16)
+    with span("svg.spans", rows=strip.shape[0]):
+        paths = {}
+        for level, x, y, w, h in _span_rects(q):
+            paths.setdefault(level, []).append(f"M{x},{y + top}h{w}v{h}h-{w}z")
+        return "".join(f'<path fill="{colors[level]}" d="{"".join(paths[level])}"/>\n'
+                       for level in sorted(paths))
+
+
+def _image_tiles_text(width, cmap, tile_px, item):
+    top, strip = item
+    elements = []
+    for x0 in range(0, width, tile_px):
+        tile = strip[:, x0:x0 + tile_px]
+        buf = io.BytesIO()
+        write_png(tile, buf, 1.0, cmap=cmap, origin="upper", compress_level=9)
+        data = base64.b64encode(buf.getvalue()).decode("ascii")
+        elements.append(
+            f'<image x="{x0}" y="{top}" width="{tile.shape[1]}" height="{tile.shape[0]}" '
+            f'preserveAspectRatio="none" href="data:image/png;base64,{data}"/>\n'
+        )
+    return "".join(elements)
+
+
+def _export_bitmap(source, outfile, resolution_mm, cmap, raster, levels, tile_px, shape,
+                   pipeline=0):
+    if raster not in RASTER_MODES:
+        raise ValueError(f"raster must be one of {RASTER_MODES}, not {raster!r}")
+    if not 2 <= levels <= 65536:
+        raise ValueError("levels must be between 2 and 65536")
+    h, w = _source_shape(source, shape)
+    strips = _numbered(_iter_strips(source, (h, w), tile_px, "lower"))
+    with _open_text(outfile) as f:
+        f.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+            f'width="{w * resolution_mm:g}mm" height="{h * resolution_mm:g}mm" '
+            f'viewBox="0 0 {w} {h}" shape-rendering="crispEdges" '
+            f'style="image-rendering:pixelated">\n'
+        )
+        if raster == "spans":
+            encode = partial(_spans_text, [_hex(c) for c in colormap_lut(cmap, levels)], levels)
+        else:
+            encode = partial(_image_tiles_text, w, cmap, tile_px)
+        _run(strips, encode, f.write, pipeline)
+        f.write("</svg>\n")
+
+
+# ----------------------------------------------------------------------
+# polygons
+# ----------------------------------------------------------------------
+POLYGON_CHUNK = 1 << 16     # polygons formatted per batch
+
+
+def _path_data(q):
+    """One ``d`` string for the ``(n, k, 2)`` integer polygons *q*: absolute move, relative lines."""
+    n, k, _ = q.shape
+    rel = q.copy()
+    rel[:, 1:] -= q[:, :-1]
+    fmt = "M%d %dl" + " ".join(["%d %d"] * (k - 1)) + "z"
+    return (fmt * n) % tuple(rel.reshape(-1).tolist())
+
+
+def _export_polygons(polys, outfile, panel_size_m, cmap, values, bounds, precision_mm, stroke_mm):
+    groups = group_by_size(polys)
+    n = sum(len(idx) for idx, _ in groups)
+    if bounds is None:
+        minx, miny = np.min([v.reshape(-1, 2).min(0) for _, v in groups if len(v)], axis=0)
+        maxx, maxy = np.max([v.reshape(-1, 2).max(0) for _, v in groups if len(v)], axis=0)
+    else:
+        minx, miny, maxx, maxy = bounds
+    units = round(panel_size_m * 1000 / precision_mm)
+    scale = units / max(maxx - minx, maxy - miny)
+    colors = [_hex(c) for c in colormap_lut(cmap)]
+    # the colormap's own 256-entry lookup: colour of x is entry floor(256 x)
+    x = np.arange(n) / n if values is None else np.asarray(values, dtype=float)
+    level = np.clip(np.floor(x * 256), 0, 255).astype(np.intp)
+    stroke = (f' stroke="#000" stroke-width="{stroke_mm / precision_mm:g}" stroke-linejoin="round"'
+              if stroke_mm > 0 else "")
+
+    with _open_text(outfile) as f:
+        f.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+            f'width="{panel_size_m * 1000:g}mm" height="{panel_size_m * 1000:g}mm" '
+            f'viewBox="0 0 {units} {units}">\n'
+        )
+        for idx, verts in groups:
+            for start in range(0, len(idx), POLYGON_CHUNK):
+                chunk = verts[start:start + POLYGON_CHUNK]
+                with span("svg.quantize", polygons=len(chunk)):
+                    q = np.rint((chunk - (minx, miny)) * scale).astype(np.int64)
+                    q[..., 1] = units - q[..., 1]   # y up, as the raster exports
+                    lv = level[idx[start:start + POLYGON_CHUNK]]
+                    order = np.argsort(lv, kind="stable")
+                    lv, q = lv[order], q[order]
+                    cuts = np.flatnonzero(np.diff(lv)) + 1
+                with span("svg.paths", polygons=len(chunk)):
+                    for a, b in zip(np.r_[0, cuts], np.r_[cuts, len(lv)]):
+                        f.write(f'<path fill="{colors[lv[a]]}"{stroke} d="{_path_data(q[a:b])}"/>\n')
+        f.write("</svg>\n")
+
+
+@profiled("export.save_svg")
 def save_svg(
     data: Union[np.ndarray, Sequence[np.ndarray]],
     outfile,
     panel_size_m: float,
     resolution_mm: float,
     cmap: str = "viridis",
+    *,
+    raster: str = "spans",
+    levels: int = 64,
+    tile_px: int = 512,
+    shape=None,
+    values=None,
+    bounds=None,
+    precision_mm: float = 0.01,
+    stroke_mm: float = 0.0,
+    pipeline: int = 0,
 ):
     """
     Parameters
     ----------
-    data           NumPy bitmap or list of polygons
-    outfile        Path ending in .svg
+    data           NumPy bitmap, iterable of row strips, list of polygons or
+                   ``(N, k, 2)`` polygon array
+    outfile        Path ending in .svg or .svgz
     panel_size_m   Physical size (square panels assumed)
     resolution_mm  mm per unit in *data* (for bitmap only)
     cmap           Matplotlib colormap name
+    raster         Bitmap mode: "spans" or "image"
+    levels         Number of colour levels in "spans" mode
+    tile_px        Rows per streamed band / image tile edge
+    shape          (rows, cols) when *data* is a strip iterable
+    values         Polygon colours as 0‒1 colormap positions (default: i / N)
+    bounds         (xmin, ymin, xmax, ymax) mapped onto the panel (default: extent)
+    precision_mm   Polygon coordinates are integers in units of this size
+    stroke_mm      Black outline width around polygons (0: none)
+    pipeline       Encode bitmap bands on this many threads, overlapped with
+                   generating and writing them (0: sequentially)
     """
-    px = int(panel_size_m * 1000 / resolution_mm)
-    dwg = svgwrite.Drawing(outfile, size=(f"{panel_size_m}m", f"{panel_size_m}m"))
-    if isinstance(data, np.ndarray):
-        _export_bitmap(data, dwg, (panel_size_m, panel_size_m), cmap)
-    else:  # assume polygons
-        # scale coordinates so max extent fits panel_size_m
-        all_xy = np.vstack(data)
-        minx, miny = all_xy.min(0)
-        maxx, maxy = all_xy.max(0)
-        scale = panel_size_m / max(maxx - minx, maxy - miny)
-        _export_polygons(data, dwg, scale, cmap)
-    dwg.save()
+    polygons = not hasattr(data, "shape") or len(data.shape) == 3
+    if shape is not None or not polygons:   # ndarray, memmap or lazy tiled array
+        _export_bitmap(data, outfile, resolution_mm, cmap, raster, levels, tile_px, shape, pipeline)
+        return
+    _export_polygons(data, outfile, panel_size_m, cmap, values, bounds, precision_mm, stroke_mm)
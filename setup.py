@@ -2,12 +2,21 @@ from setuptools import setup, find_packages
 
 setup(
     name="quantum_staircase",
-    version="0.1.0",
+    version="0.1.0",  # keep in sync with quantum_staircase.__version__
     description="Quantum physics‑inspired tiling generator for architectural panels",
     author="Quantum Staircase Team",
     license="MIT",
     packages=find_packages(),
     install_requires=[ln.strip() for ln in open("requirements.txt") if ln.strip() and not ln.startswith("#")],
-    entry_points={"console_scripts": ["quantum-staircase=quantum_staircase.cli:main"]},
+    entry_points={
+        "console_scripts": ["quantum-staircase=quantum_staircase.cli:main"],
+        # theme plugins: name = module:ThemeSpec (see patterns/_registry.py)
+        "quantum_staircase.themes": [
+            f"{name} = quantum_staircase.patterns._registry:{spec}"
+            for name, spec in [("ligo", "LIGO"), ("quantum_optics", "QUANTUM_OPTICS"),
+                               ("condensed_matter", "CONDENSED_MATTER"), ("amo", "AMO"),
+                               ("qec", "QEC"), ("tensor", "TENSOR"), ("penrose", "PENROSE")]
+        ],
+    },
     python_requires=">=3.9",
 )
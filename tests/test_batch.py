@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from quantum_staircase import batch, patterns
+from quantum_staircase.utils import export
+
+MANIFEST = """
+[defaults]
+resolution_mm = 2.0
+output_dir = "out"
+
+[[panel]]
+name = "square"
+theme = "ligo"
+size_m = 0.2
+output = "square.png"
+
+[[panel]]
+name = "blend"
+themes = ["qec", "amo"]
+width_m = 0.2
+height_m = 0.3
+output = "blend.tif"
+mode = "gray16"
+"""
+
+
+def _write(tmp_path, text=MANIFEST):
+    path = tmp_path / "wall.toml"
+    path.write_text(text)
+    return path
+
+
+def _statuses(report):
+    return {p["name"]: p["status"] for p in report["panels"]}
+
+
+def test_load_manifest_applies_defaults(tmp_path):
+    square, blended = batch.load_manifest(_write(tmp_path))
+    assert square.themes == ("ligo",) and square.width_m == square.height_m == 0.2
+    assert square.resolution_mm == 2.0
+    assert square.output == str((tmp_path / "out" / "square.png").resolve())
+    assert blended.themes == ("qec", "amo") and blended.mode == "gray16"
+
+
+@pytest.mark.parametrize("entry, match", [
+    ('theme = "ligo"\nsize_m = 1\noutput = "x.png"\ncolour = 1', "unknown keys"),
+    ('theme = "nope"\nsize_m = 1\noutput = "x.png"', "unknown themes"),
+    ('theme = "ligo"\nthemes = ["amo"]\nsize_m = 1\noutput = "x.png"', "exactly one"),
+    ('theme = "ligo"\nwidth_m = 1\noutput = "x.png"', "size_m"),
+    ('theme = "ligo"\nsize_m = 1', "output"),
+])
+def test_load_manifest_rejects_bad_panels(tmp_path, entry, match):
+    with pytest.raises(ValueError, match=match):
+        batch.load_manifest(_write(tmp_path, f"[[panel]]\n{entry}\n"))
+
+
+def test_incremental_rebuild(tmp_path):
+    manifest = _write(tmp_path)
+    log = []
+    assert set(_statuses(batch.run(manifest, log=log.append)).values()) == {"rendered"}
+    assert (tmp_path / "out" / "square.png").exists() and (tmp_path / "out" / "blend.tif").exists()
+    assert set(_statuses(batch.run(manifest, log=log.append)).values()) == {"up-to-date"}
+
+    manifest.write_text(MANIFEST.replace('mode = "gray16"', 'mode = "gray8"'))
+    assert _statuses(batch.run(manifest, log=log.append)) == {"square": "up-to-date", "blend": "rendered"}
+
+    (tmp_path / "out" / "square.png").unlink()
+    report = batch.run(manifest, dry_run=True, log=log.append)
+    assert _statuses(report) == {"square": "stale", "blend": "up-to-date"}
+    assert not (tmp_path / "out" / "square.png").exists()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_failed_panel_is_reported_and_not_recorded(tmp_path, jobs):
+    manifest = _write(tmp_path, MANIFEST.replace('mode = "gray16"', 'mode = "cmyk"'))
+    report = batch.run(manifest, jobs=jobs, log=lambda msg: None)
+    assert _statuses(report) == {"square": "rendered", "blend": "failed"}
+    state = json.loads(manifest.with_suffix(".state.json").read_text())
+    assert list(state) == [str((tmp_path / "out" / "square.png").resolve())]
+    assert not list((tmp_path / "out").glob(".*partial*"))
+    assert batch.main([str(manifest)]) == 1
+
+
+def test_panel_key_tracks_params_not_name(tmp_path):
+    square, _ = batch.load_manifest(_write(tmp_path))
+    assert batch.panel_key(square) == batch.panel_key(square._replace(name="renamed"))
+    assert batch.panel_key(square) != batch.panel_key(square._replace(resolution_mm=1.0))
+
+
+def test_render_panel_matches_full_render(tmp_path):
+    square, _ = batch.load_manifest(_write(tmp_path))
+    out = batch.render_panel(square, tmp_path / "streamed.png")
+    export.save_image(patterns.get_theme("ligo")(0.2, 2.0), tmp_path / "full.png", 0.2, 2.0,
+                      rows_per_strip=square.tile_px)
+    assert out.read_bytes() == (tmp_path / "full.png").read_bytes()
@@ -0,0 +1,85 @@
+import pytest
+
+from benchmarks import cases, run
+from benchmarks.run import compare, measure
+
+
+def _report(**results):
+    return {"machine": {"node": "test"}, "results": results}
+
+
+def _record(seconds, rss=10.0, alloc=10.0):
+    return {"min": seconds, "peak_rss_mb": rss, "alloc_peak_mb": alloc}
+
+
+def test_case_names_cover_requested_stages():
+    names = list(cases.CASES)
+    for prefix in ("theme/", "penrose/tiling/", "penrose/merge/", "penrose/validate/",
+                   "penrose/rasterize/", "export/save_image/", "export/save_svg/"):
+        assert any(n.startswith(prefix) for n in names), prefix
+    assert any(c.quick for c in cases.CASES.values())
+
+
+def test_measure_quick_case():
+    r = measure("theme/qec/0.2m@1mm", repeat=2)
+    assert len(r["seconds"]) == 2
+    assert r["min"] <= r["median"]
+    assert r["alloc_peak_mb"] >= 0
+
+
+def test_session_cleans_up_and_bypasses_the_cache(tmp_path):
+    from quantum_staircase.utils import cache
+
+    cache.set_cache(tmp_path)
+    try:
+        with cases.session() as scratch:
+            assert cache.get_cache() is None and cases._scratch(".png").parent == scratch
+        assert not scratch.exists() and cache.get_cache().directory == tmp_path
+    finally:
+        cache.set_cache(None)
+    assert "error" not in measure("export/save_image/png-gray8/200px", repeat=1)
+
+
+def test_dead_child_is_reported(monkeypatch):
+    class Killed:
+        exitcode = -9
+
+        def __init__(self, **kwargs):
+            pass
+
+        def start(self):
+            pass
+
+        def is_alive(self):
+            return False
+
+        def join(self):
+            pass
+
+    spawn = run.mp.get_context("spawn")
+    monkeypatch.setattr(run.mp, "get_context", lambda method: type("Ctx", (), {
+        "Queue": staticmethod(spawn.Queue), "Process": Killed})())
+    assert run._isolated("theme/qec/0.2m@1mm", 1, poll=0.01) == {
+        "error": "benchmark process died (exit code -9)"}
+
+
+def test_compare_flags_only_past_threshold():
+    old = _report(a=_record(1.0), b=_record(1.0), c=_record(1.0), gone=_record(1.0))
+    new = _report(a=_record(1.05), b=_record(1.5), c=_record(1.0, rss=40.0), new=_record(1.0))
+    rows, regressions = compare(old, new, threshold=0.1)
+    assert regressions == [("b", "min"), ("c", "peak_rss_mb")]
+    assert {r[0] for r in rows} == {"a", "b", "c"}
+
+
+def test_compare_ignores_small_memory_noise_and_skips():
+    old = _report(a=_record(1.0, rss=0.1), s={"skipped": "svgwrite"})
+    new = _report(a=_record(1.0, rss=0.5), s={"skipped": "svgwrite"})
+    rows, regressions = compare(old, new, threshold=0.1)
+    assert regressions == []
+    assert all(r[0] == "a" for r in rows)
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.5])
+def test_compare_identical_runs(threshold):
+    run = _report(a=_record(0.2), b=_record(3.0))
+    assert compare(run, run, threshold)[1] == []
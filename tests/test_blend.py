@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from quantum_staircase import patterns
+from quantum_staircase.patterns import blend
+
+THEMES = ["ligo", "amo", "qec"]
+
+
+def _prerendered(width_m, height_m, res_mm, themes, frac, axis):
+    """The original full-canvas build_panel."""
+    px_w, px_h = int(width_m * 1000 / res_mm), int(height_m * 1000 / res_mm)
+    n = len(themes)
+    slice_px = (px_h if axis == "y" else px_w) // n
+    blend_px = max(1, int(frac * slice_px))
+    img = {t: patterns.get_theme(t)(max(width_m, height_m), res_mm)[:px_h, :px_w] for t in themes}
+    panel = np.zeros((px_h, px_w))
+    view = (lambda a, s, e: a[s:e, :]) if axis == "y" else (lambda a, s, e: a[:, s:e])
+    for i, t in enumerate(themes):
+        view(panel, i * slice_px, (i + 1) * slice_px)[...] = view(img[t], i * slice_px, (i + 1) * slice_px)
+    for i in range(n - 1):
+        s, e = (i + 1) * slice_px - blend_px, (i + 1) * slice_px + blend_px
+        w = np.linspace(0, 1, e - s)
+        view(panel, s, e)[...] = blend._cos_blend(view(img[themes[i]], s, e), view(img[themes[i + 1]], s, e),
+                                                  w[:, None] if axis == "y" else w)
+    return np.clip(panel, 0, 1)
+
+
+@pytest.mark.parametrize("axis", ["x", "y"])
+def test_lazy_panel_matches_prerendered(axis):
+    expected = _prerendered(0.05, 0.122, 1, THEMES, 0.2, axis)
+    assert np.array_equal(blend.build_panel(0.05, 0.122, 1, THEMES, 0.2, axis=axis), expected)
+
+
+def test_streamed_segments_cover_panel_in_reverse():
+    segments = blend.iter_segments(0.05, 0.1, 1, THEMES, 0.12, workers=2, reverse=True)
+    strips = [pixels for _, pixels in segments]
+    expected = blend.build_panel(0.05, 0.1, 1, THEMES, 0.12)
+    assert np.array_equal(np.concatenate(strips[::-1]), expected)
+
+
+def test_overlapping_blend_bands_refused():
+    with pytest.raises(ValueError):
+        blend.panel_segments(0.05, 0.1, 1, THEMES, 0.6)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_banded_parallel_panel_matches_serial(backend):
+    serial = blend.build_panel(0.05, 0.1, 1, THEMES, 0.12)
+    banded = blend.build_panel(0.05, 0.1, 1, THEMES, 0.12, workers=2, backend=backend, band_px=16)
+    assert np.array_equal(banded, serial)
+
+
+def test_float32_panel():
+    panel = blend.build_panel(0.05, 0.1, 1, THEMES, 0.12, dtype=np.float32)
+    assert panel.dtype == np.float32
+    assert np.allclose(panel, blend.build_panel(0.05, 0.1, 1, THEMES, 0.12), atol=1e-5)
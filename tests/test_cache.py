@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from quantum_staircase import patterns
+from quantum_staircase.patterns import penrose
+from quantum_staircase.utils import cache
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    yield cache.set_cache(tmp_path)
+    cache.set_cache(None)
+
+
+def test_theme_window_round_trip(disk_cache):
+    full = patterns.get_theme("ligo")(0.1, 1)
+    again = patterns.get_theme("ligo")(0.1, 1)
+    win = patterns.get_window("ligo")(0.1, 1, 0, 0, 100, 100)
+    assert isinstance(again, np.memmap) and np.array_equal(again, full) and np.array_equal(win, full)
+    again[:] = 0   # copy-on-write: the stored entry is untouched
+    assert np.array_equal(patterns.get_theme("ligo")(0.1, 1), full)
+    assert (disk_cache.stats.hits, disk_cache.stats.misses) == (3, 1)
+    patterns.get_theme("ligo")(0.1, 2)
+    assert disk_cache.stats.misses == 2
+
+
+def test_ragged_polygons_round_trip(disk_cache):
+    polys = penrose.generate_tiles(2)
+    assert all(np.array_equal(a, b) for a, b in zip(penrose.generate_tiles(2), polys))
+    assert penrose.generate_tiles(3, bbox=(10, 10, 11, 11)) == []
+    assert penrose.generate_tiles(3, bbox=(10, 10, 11, 11)) == []
+    assert disk_cache.stats.hits == 2
+
+
+def test_lru_eviction(tmp_path):
+    disk = cache.DiskCache(tmp_path, max_bytes=3000)
+    for k in range(4):
+        disk.put(str(k), np.zeros(100))          # 928 bytes each
+        disk.get("0")                            # keep entry 0 fresh
+    assert disk.stats.evictions == 1
+    assert disk.get("0") is not None and disk.get("1") is None
+    assert disk.size() <= 3000
+
+
+def test_writes_under_the_limit_skip_the_scan(tmp_path, monkeypatch):
+    disk = cache.DiskCache(tmp_path, max_bytes=4700)
+    disk.put("seed", np.zeros(10))
+    scans = []
+    entries = disk._entries
+    monkeypatch.setattr(disk, "_entries", lambda: scans.append(1) or entries())
+    for k in range(4):
+        disk.put(str(k), np.zeros(100))          # 928 bytes each
+        disk.put(str(k), np.zeros(100))          # rewriting a key does not grow the total
+    assert scans == [] and disk.stats.evictions == 0
+    disk.put("4", np.zeros(100))                 # over the limit: one scan evicts "seed"
+    assert len(scans) == 1 and disk.stats.evictions == 1
+    assert disk._bytes == disk.size() <= 4700
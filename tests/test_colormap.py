@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from matplotlib import colormaps
+
+from quantum_staircase.utils import colormap, raster_export
+
+
+def _reference(data, vmin, vmax, maxval, dtype):
+    scaled = (np.asarray(data, dtype=float) - vmin) * (maxval / (vmax - vmin))
+    return np.rint(np.clip(scaled, 0, maxval)).astype(dtype)
+
+
+@pytest.mark.parametrize("maxval, dtype", [(255, np.uint8), (65535, ">u2"), (63, np.uint16)])
+def test_quantize_matches_reference_in_any_chunking(maxval, dtype):
+    data = np.random.default_rng(0).uniform(-0.2, 1.2, (37, 53)).astype(np.float32)
+    expected = _reference(data, 0.0, 1.0, maxval, dtype)
+    for chunk_rows in (None, 1, 5, 100):
+        got = colormap.quantize(data, 0.0, 1.0, maxval, dtype, chunk_rows=chunk_rows)
+        assert got.dtype == np.dtype(dtype)
+        assert np.array_equal(got, expected)
+
+
+def test_quantize_default_dtype_and_out():
+    data = np.linspace(0, 1, 12).reshape(3, 4)
+    assert colormap.quantize(data, 0, 1, 255).dtype == np.uint8
+    assert colormap.quantize(data, 0, 1, 1023).dtype == np.uint16
+    out = np.zeros((3, 4), np.uint8)
+    assert colormap.quantize(data, 0, 1, 255, out=out) is out
+
+
+@pytest.mark.parametrize("dither", [False, True])
+def test_constant_data_maps_to_level_zero(dither, tmp_path):
+    flat = np.full((5, 7), 0.25)
+    with np.errstate(all="raise"):
+        levels = colormap.quantize(flat, 0.25, 0.25, 255, dither=dither)
+    assert np.array_equal(levels, np.zeros((5, 7), np.uint8))
+    if not dither:
+        from quantum_staircase.utils.export import save_image
+
+        save_image(flat, tmp_path / "flat.jpg", 0.01, 1.0)      # matplotlib path, data range 0
+        assert (tmp_path / "flat.jpg").stat().st_size
+
+
+def test_dither_preserves_mean_and_joins_strips():
+    flat = np.full((64, 64), 0.3)
+    levels = colormap.quantize(flat, 0, 1, 7, dither=True)
+    assert set(np.unique(levels)) == {2, 3}
+    assert levels.mean() == pytest.approx(0.3 * 7, abs=1 / 64)
+
+    ramp = np.random.default_rng(1).random((40, 30))
+    whole = colormap.quantize(ramp, 0, 1, 15, dither=True)
+    parts = [colormap.quantize(ramp[top:top + 7], 0, 1, 15, dither=True, row0=top)
+             for top in range(0, 40, 7)]
+    assert np.array_equal(np.concatenate(parts), whole)
+    assert np.abs(whole.astype(int) - np.rint(ramp * 15)).max() <= 1
+
+
+def test_lut_and_apply_colormap():
+    lut = colormap.colormap_lut("viridis", 256, alpha=True)
+    assert lut.shape == (256, 4) and not lut.flags.writeable
+    assert colormap.colormap_lut("viridis", 256) is not None
+    assert colormap.colormap_lut("magma", 65536).shape == (65536, 3)
+    with pytest.raises(ValueError):
+        colormap.colormap_lut("viridis", 1 << 17)
+
+    data = np.arange(256).reshape(16, 16) / 255
+    rgb = colormap.apply_colormap(data, "viridis")
+    expected = np.rint(colormaps["viridis"](data)[..., :3] * 255).astype(np.uint8)
+    assert np.array_equal(rgb, expected)
+
+
+def test_png_dither_option(tmp_path):
+    data = np.random.default_rng(2).random((50, 40))
+    raster_export.write_png(data, tmp_path / "plain.png", 1.0, mode="gray8")
+    raster_export.write_png(data, tmp_path / "dither.png", 1.0, mode="gray8", dither=True)
+    assert (tmp_path / "plain.png").read_bytes() != (tmp_path / "dither.png").read_bytes()
@@ -1,10 +1,46 @@
 from quantum_staircase.patterns import ligo
 from quantum_staircase.utils.export import save_image
+from quantum_staircase.utils.raster_export import save_raster
 from pathlib import Path
 import numpy as np
+import pytest
 
 def test_export(tmp_path):
     arr = ligo.generate(0.1, 1)
     out = tmp_path / "panel.png"
     save_image(arr, out, 0.1, 1)
     assert out.exists() and out.stat().st_size > 0
+
+
+def test_png_pixels_and_dpi(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    arr = np.linspace(0, 1, 6 * 5).reshape(6, 5)
+    out = tmp_path / "panel.png"
+    save_image(arr, out, 0.005, 1, mode="gray8", rows_per_strip=4)
+    with Image.open(out) as im:
+        assert im.info["dpi"][0] == pytest.approx(25.4, abs=0.01)
+        got = np.asarray(im)
+    assert np.array_equal(got, np.rint(arr[::-1] * 255).astype(np.uint8))
+
+
+@pytest.mark.parametrize("suffix", [".png", ".tif"])
+def test_strips_match_array(tmp_path, suffix):
+    arr = ligo.generate(0.05, 1)
+    a, b = tmp_path / f"a{suffix}", tmp_path / f"b{suffix}"
+    save_raster(arr, a, 1, mode="gray16", rows_per_strip=16)
+    strips = (arr[max(0, r - 7):r] for r in range(50, 0, -7))
+    save_raster(strips, b, 1, mode="gray16", rows_per_strip=16, shape=arr.shape)
+    assert a.read_bytes() == b.read_bytes()
+
+
+def test_tiff_roundtrip(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    arr = ligo.generate(0.04, 1)
+    out = tmp_path / "panel.tif"
+    save_raster(arr, out, 1, mode="palette", rows_per_strip=7)
+    with Image.open(out) as im:
+        assert im.size == (40, 40)
+        rgb = np.asarray(im.convert("RGB"))
+    save_raster(arr, tmp_path / "ref.tif", 1, mode="rgb8", compression="none")
+    with Image.open(tmp_path / "ref.tif") as im:
+        assert np.array_equal(rgb, np.asarray(im))
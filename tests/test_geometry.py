@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+import shapely
+
+from quantum_staircase.utils import geometry
+from quantum_staircase.utils.geometry import (CROSSING, NONFINITE, SHORT_EDGE, SPIKE, TINY,
+                                              UNCHECKED)
+from quantum_staircase.utils.validation import _clean_all
+
+L_SHAPE = np.array([[0, 0], [2, 0], [2, 1], [1, 1], [1, 2], [0, 2]], float)
+
+
+def test_angle_broadcasts():
+    assert geometry.angle((1, 0), (0, 0), (0, 1)) == pytest.approx(90)
+    p1 = np.zeros((2, 2))
+    got = geometry.angle([[1, 0], [1, 1]], p1, [[0, 1], [0, 1]])
+    assert np.allclose(got, [90, 45])
+
+
+@pytest.mark.parametrize("flip", [False, True])
+def test_stats_of_l_shape(flip):
+    polys = (L_SHAPE[::-1] if flip else L_SHAPE)[None]
+    stats = geometry.polygon_stats(polys)
+    assert stats.area[0] == pytest.approx(-3 if flip else 3)
+    assert stats.orientation[0] == (-1 if flip else 1)
+    assert sorted(stats.angles[0].round(9)) == [90] * 5 + [270]
+    assert sorted(stats.edge_lengths[0]) == [1, 1, 1, 1, 2, 2]
+    assert not stats.degenerate[0]
+
+
+def test_degeneracy_flags():
+    polys = np.array([
+        [[0, 0], [1, 0], [1, 1], [0, 1]],               # fine
+        [[0, 0], [1, 1], [1, 0], [0, 1]],               # bow tie
+        [[0, 0], [2, 0], [1, 0], [0, 1]],               # folds back along the base
+        [[0, 0], [0, 0], [1, 0], [0, 1]],               # repeated vertex
+        [[0, 0], [1e-6, 0], [1e-6, 1e-6], [0, 1e-6]],   # tiny
+        [[0, 0], [np.nan, 0], [1, 1], [0, 1]],
+    ], float)
+    flags = geometry.degeneracy_flags(polys, min_area=1e-9)
+    assert flags[0] == 0
+    assert flags[1] & CROSSING          # its lobes cancel, but cleaning keeps them
+    assert flags[2] & SPIKE
+    assert flags[3] & SHORT_EDGE
+    assert flags[4] == TINY
+    assert flags[5] & NONFINITE
+    valid, dropped = geometry.prefilter(polys, min_area=1e-9)
+    assert valid.tolist() == [True, False, False, False, False, False]
+    assert dropped.tolist() == [False, False, False, False, True, True]
+
+
+def test_many_vertices_unchecked():
+    t = np.linspace(0, 2 * np.pi, geometry.MAX_CROSSING_K + 1, endpoint=False)
+    circle = np.stack([np.cos(t), np.sin(t)], -1)[None]
+    assert geometry.degeneracy_flags(circle)[0] == UNCHECKED
+
+
+@pytest.mark.parametrize("k", [3, 4, 6])
+def test_agrees_with_shapely(k):
+    polys = np.random.default_rng(k).random((3000, k, 2))
+    geoms = shapely.polygons(polys)
+    assert np.allclose(np.abs(geometry.signed_areas(polys)), shapely.area(geoms))
+    valid, _ = geometry.prefilter(polys)
+    assert np.array_equal(valid, shapely.is_valid(geoms))
+
+
+def test_clean_all_matches_buffer():
+    rng = np.random.default_rng(3)
+    polys = [rng.random((k, 2)) for k in rng.integers(3, 7, 300)]
+    geoms, index = _clean_all(polys, 1e-3)
+    cleaned = shapely.buffer(np.array([shapely.polygons(p) for p in polys]), 0)
+    expect = np.flatnonzero(~shapely.is_empty(cleaned) & (shapely.area(cleaned) >= 1e-3))
+    assert index.tolist() == expect.tolist()
+    assert np.allclose(shapely.area(geoms), shapely.area(cleaned[expect]))
+
+
+def test_is_convex():
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], float)
+    straight = np.array([[0, 0], [1, 0], [2, 0], [2, 1], [0, 1], [0, 0.5]], float)
+    t = np.arange(5) * 4 * np.pi / 5
+    star = np.stack([np.cos(t), np.sin(t)], -1)                     # turns one way, winds twice
+    assert geometry.is_convex(np.stack([square, square[::-1]])).all()
+    assert geometry.is_convex(straight[None])[0]
+    assert not geometry.is_convex(L_SHAPE[None])[0]
+    assert not geometry.is_convex(star[None])[0]
+    assert not geometry.is_convex(np.array([[[0, 0], [2, 0], [1, 0], [0, 1]]], float))[0]
+
+
+@pytest.mark.parametrize("k", [3, 4, 6])
+def test_convex_intersection_areas_match_shapely(k):
+    rng = np.random.default_rng(k)
+    t = np.sort(rng.uniform(0, 2 * np.pi, (2, 2000, k)), -1)
+    polys = np.stack([np.cos(t), np.sin(t)], -1) + rng.uniform(-1, 1, (2, 2000, 1, 2))
+    a, b = polys[0], polys[1]
+    b[::2] = b[::2, ::-1]                                            # either orientation
+    assert geometry.is_convex(a).all() and geometry.is_convex(b).all()
+    expect = shapely.area(shapely.intersection(shapely.polygons(a), shapely.polygons(b)))
+    assert np.allclose(geometry.convex_intersection_areas(a, b), expect, rtol=0, atol=1e-12)
+    got = geometry.convex_intersection_areas(a, b, min_area=1e-3)
+    assert np.allclose(got[expect > 1e-3], expect[expect > 1e-3], rtol=0, atol=1e-12)
+    assert (got[expect <= 1e-3] <= 1e-3).all()
@@ -1,7 +1,13 @@
 from hypothesis import given, settings
 import hypothesis.strategies as st
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+from shapely.ops import unary_union
 from quantum_staircase.patterns import penrose
+from quantum_staircase.utils import geometry
 from quantum_staircase.utils.validation import validate_polygons
+from quantum_staircase.vendor.pynrose_core import PenroseTiling, tau
 
 
 @settings(max_examples=20, deadline=None)   # ← disable 200 ms deadline
@@ -10,3 +16,42 @@ def test_penrose_any_level(level):
     polys = penrose.generate_tiles(level=level)
     ok, _ = validate_polygons(polys, tol=1e-1)
     assert ok
+
+
+def test_tile_array_matches_tile_vertices():
+    tiler = PenroseTiling(3)
+    verts, thick = tiler.tile_array()
+    assert verts.shape == (len(tiler), 4, 2) and thick.shape == (len(tiler),)
+    assert not verts.flags.writeable
+    assert np.array_equal(np.array(tiler.tile_vertices()), verts)
+
+
+@pytest.mark.parametrize("level", [1, 4, 7])
+def test_rhombs_form_a_p3_patch(level):
+    verts, thick = PenroseTiling(level).tile_array()
+    assert geometry.prefilter(verts)[0].all()
+    stats = geometry.polygon_stats(verts)
+    assert np.allclose(stats.edge_lengths, tau ** -level) and (stats.orientation == 1).all()
+    # no overlaps: the rhomb areas add up to the area of their union
+    assert np.isclose(stats.area.sum(), unary_union([Polygon(v) for v in verts]).area)
+    if level == 7:
+        assert abs(thick.sum() / (~thick).sum() - tau) < 0.02
+
+
+def test_bbox_pruning_equals_filtered_full_tiling():
+    bbox = (0.3, 0.2, 0.5, 0.4)
+    verts, _ = PenroseTiling(6).tile_array()
+    lo, hi = verts.min(1), verts.max(1)
+    keep = (hi[:, 0] >= 0.3) & (lo[:, 0] <= 0.5) & (hi[:, 1] >= 0.2) & (lo[:, 1] <= 0.4)
+    assert np.array_equal(PenroseTiling(6, bbox).tile_array()[0], verts[keep])
+    assert penrose.generate_tiles(3, bbox=(10, 10, 11, 11)) == []
+
+
+def test_export_svg_streams_thick_and_thin(tmp_path):
+    import xml.etree.ElementTree as ET
+
+    out = tmp_path / "penrose.svg"
+    penrose.export_svg(out, 1.0, level=3)
+    paths = list(ET.parse(out).getroot().iter("{http://www.w3.org/2000/svg}path"))
+    assert len(paths) == 2
+    assert all(p.get("stroke-width") == f"{penrose.EDGE_MM / 0.01:g}" for p in paths)
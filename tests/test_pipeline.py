@@ -0,0 +1,85 @@
+import threading
+import zlib
+
+import numpy as np
+import pytest
+
+from quantum_staircase import patterns
+from quantum_staircase.utils import pipeline
+from quantum_staircase.utils.raster_export import _adler32_combine, save_raster
+from quantum_staircase.utils.svg_export import save_svg
+
+
+def test_run_keeps_order_and_bounds_in_flight():
+    produced, written = [], []
+    lock = threading.Lock()
+
+    def items():
+        for i in range(50):
+            with lock:
+                produced.append(i)
+                # generation never runs more than queue + encoders ahead of the writer
+                assert len(produced) - len(written) <= 2 + 2 * 3 + 2
+            yield i
+
+    def write(x):
+        with lock:
+            written.append(x)
+
+    pipeline.run(items(), lambda i: i * i, write, workers=3, depth=2)
+    assert written == [i * i for i in range(50)]
+
+
+@pytest.mark.parametrize("stage", ["generate", "encode", "write"])
+def test_run_propagates_errors(stage):
+    def items():
+        for i in range(20):
+            if stage == "generate" and i == 5:
+                raise RuntimeError("boom")
+            yield i
+
+    def encode(i):
+        if stage == "encode" and i == 5:
+            raise RuntimeError("boom")
+        return i
+
+    def write(i):
+        if stage == "write" and i == 5:
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run(items(), encode, write, workers=2)
+
+
+def test_adler32_combine():
+    a, b = b"quantum " * 1000, b"staircase" * 7001
+    assert _adler32_combine(zlib.adler32(a), zlib.adler32(b), len(b)) == zlib.adler32(a + b)
+
+
+def test_pipelined_tiff_identical(tmp_path):
+    arr = patterns.get_theme("ligo")(0.1, 1)
+    a, b = tmp_path / "a.tif", tmp_path / "b.tif"
+    save_raster(arr, a, 1, mode="rgb8", rows_per_strip=16, dither=True)
+    save_raster(arr, b, 1, mode="rgb8", rows_per_strip=16, dither=True, pipeline=3)
+    assert a.read_bytes() == b.read_bytes()
+
+
+@pytest.mark.parametrize("mode", ["gray16", "palette"])
+def test_pipelined_png_same_pixels(tmp_path, mode):
+    Image = pytest.importorskip("PIL.Image")
+    px = patterns.panel_px(0.1, 1)
+    a, b = tmp_path / "a.png", tmp_path / "b.png"
+    save_raster(patterns.get_theme("amo")(0.1, 1), a, 1, mode=mode, rows_per_strip=16)
+    strips = patterns.iter_strips("amo", 0.1, 1, rows=13, reverse=True)
+    save_raster(strips, b, 1, mode=mode, rows_per_strip=16, shape=(px, px), pipeline=2)
+    with Image.open(a) as im_a, Image.open(b) as im_b:
+        assert np.array_equal(np.asarray(im_a), np.asarray(im_b))
+
+
+@pytest.mark.parametrize("raster", ["spans", "image"])
+def test_pipelined_svg_identical(tmp_path, raster):
+    arr = patterns.get_theme("ligo")(0.06, 1)
+    a, b = tmp_path / "a.svg", tmp_path / "b.svg"
+    save_svg(arr, a, 0.06, 1, raster=raster, tile_px=8)
+    save_svg(arr, b, 0.06, 1, raster=raster, tile_px=8, pipeline=2)
+    assert a.read_text() == b.read_text()
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from quantum_staircase import patterns, preview
+
+
+def _display(name, size, res):
+    return np.asarray(patterns.get_theme(name)(size, res))[::-1]
+
+
+def _pyramid(name, size, res, tile_px):
+    levels = {}
+    for z, x, y, tile in preview.iter_pyramid(name, size, res, tile_px):
+        levels.setdefault(z, {})[x, y] = tile
+    return levels
+
+
+def _stitch(tiles, tile_px):
+    rows = max(y for _, y in tiles) + 1
+    cols = max(x for x, _ in tiles) + 1
+    return np.block([[tiles[x, y] for x in range(cols)] for y in range(rows)])
+
+
+def test_level_shapes():
+    assert preview.level_shapes(300, 64) == [(38, 38), (75, 75), (150, 150), (300, 300)]
+    assert preview.level_shapes(64, 64) == [(64, 64)]
+    with pytest.raises(ValueError):
+        preview.level_shapes(100, 63)
+
+
+def test_downsample2_odd_edges():
+    tile = np.arange(15.0).reshape(3, 5)
+    small = preview.downsample2(tile)
+    assert small.shape == (2, 3)
+    assert small[0, 0] == tile[:2, :2].mean()
+    assert small[1, 2] == tile[2, 4]
+    assert small[0, 2] == tile[:2, 4].mean()
+
+
+@pytest.mark.parametrize("name", ["ligo", "qec"])
+def test_pyramid_levels_are_exact_box_means(name):
+    size, res, tile_px = 0.3, 2.0, 32      # 150 px → 5 levels, odd level sizes
+    full = _display(name, size, res)
+    levels = _pyramid(name, size, res, tile_px)
+    shapes = preview.level_shapes(150, tile_px)
+    assert sorted(levels) == list(range(len(shapes)))
+    expected = full
+    for z in reversed(range(len(shapes))):
+        got = _stitch(levels[z], tile_px)
+        assert got.shape == shapes[z]
+        assert np.allclose(got, expected)
+        expected = preview.downsample2(expected)
+
+
+def test_write_pyramid_files(tmp_path):
+    shapes = preview.write_pyramid("amo", 0.2, 2.0, tmp_path, tile_px=32)
+    pngs = sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*.png"))
+    assert "0/0/0.png" in pngs and f"{len(shapes) - 1}/3/3.png" in pngs
+    assert (tmp_path / "index.html").read_text().count("tile_px") >= 1
+
+
+def test_sample_pixels_exact_for_periodic_and_full_pitch():
+    rows, cols = np.arange(299, 0, -7), np.arange(0, 300, 7)
+    for name, step in [("qec", 8), ("condensed_matter", 4), ("ligo", 1)]:
+        full = np.asarray(patterns.get_theme(name)(0.3, 1.0))
+        got = preview.sample_pixels(name, 0.3, 1.0, rows, cols, step)
+        assert np.array_equal(got, full[np.ix_(rows, cols)])
+
+
+@pytest.mark.parametrize("name", patterns.list_themes())
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_coarse_previews_sample_the_full_pitch_panel(name, dtype):
+    full = np.asarray(patterns.get_theme(name)(0.3, 1.0, dtype=dtype))
+    for step, img in preview.iter_progressive(name, 0.3, 1.0, (16, 5), dtype):
+        assert img.dtype == dtype
+        assert np.array_equal(img, full[::step, ::step])
+    rows, cols = np.arange(299, 0, -8), np.arange(3, 300, 8)
+    assert np.array_equal(preview.sample_pixels(name, 0.3, 1.0, rows, cols, 8, dtype),
+                          full[np.ix_(rows, cols)])
+
+
+def test_progressive_shapes_and_final_exact():
+    steps = list(preview.iter_progressive("tensor", 0.3, 1.0, (16, 4, 1)))
+    assert [(s, img.shape) for s, img in steps] == [(16, (19, 19)), (4, (75, 75)), (1, (300, 300))]
+    assert np.array_equal(steps[-1][1], patterns.get_theme("tensor")(0.3, 1.0))
+    assert 0 <= steps[0][1].min() and steps[0][1].max() <= 1
+
+
+def test_tile_server(tmp_path):
+    server = preview.TileServer("ligo", 0.2, 1.0, tmp_path, tile_px=64)
+    zmax = len(server.shapes) - 1
+    full = _display("ligo", 0.2, 1.0)
+    assert np.array_equal(server.pixels(zmax, 1, 2), full[128:192, 64:128])
+    assert server.png(zmax, 1, 2).startswith(b"\x89PNG")
+    assert (tmp_path / str(zmax) / "1" / "2.png").exists()
+    server.png(0, 0, 0)
+    assert not (tmp_path / "0").exists()          # previews stay in memory
+    with pytest.raises(KeyError):
+        server.png(zmax + 1, 0, 0)
+
+
+def test_tile_server_bounds_its_previews(tmp_path):
+    server = preview.TileServer("ligo", 0.2, 1.0, tmp_path, tile_px=16)
+    z = len(server.shapes) - 2
+    tiles = [(z, x, y) for x in range(3) for y in range(3)]
+    sizes = {t: len(server.png(*t)) for t in tiles}
+    server.cache_bytes = 4 * max(sizes.values())
+    server.png(*tiles[0])                         # a cache hit refreshes its tile
+    server.png(z, 3, 3)                           # and a new preview evicts the oldest others
+    assert tiles[0] in server.previews and (z, 3, 3) in server.previews
+    assert tiles[1] not in server.previews
+    assert server._cached_bytes == sum(map(len, server.previews.values())) <= server.cache_bytes
@@ -0,0 +1,82 @@
+import json
+import threading
+
+import numpy as np
+
+from quantum_staircase import patterns
+from quantum_staircase.utils import export, profiling
+
+
+def test_disabled_span_is_shared_noop():
+    assert profiling.get_profiler() is None
+    assert profiling.span("a") is profiling.span("b", x=1)
+
+
+def test_spans_hooks_and_summary():
+    seen = []
+    with profiling.profile(seen.append) as prof:
+        with profiling.span("outer", n=3):
+            for _ in range(3):
+                with profiling.span("inner"):
+                    pass
+    assert profiling.get_profiler() is None
+    assert [s.name for s in prof.spans] == ["inner"] * 3 + ["outer"]
+    assert seen == prof.spans
+    outer = prof.spans[-1]
+    assert outer.args == {"n": 3}
+    assert all(s.start >= outer.start and s.seconds <= outer.seconds for s in prof.spans[:3])
+    summary = prof.summary()
+    assert summary["inner"]["calls"] == 3 and summary["outer"]["calls"] == 1
+
+
+def test_keep_false_only_feeds_hooks():
+    seen = []
+    with profiling.profile(keep=False) as prof:
+        prof.add_hook(lambda s: seen.append(s.name))
+        with profiling.span("stage"):
+            pass
+    assert prof.spans == [] and seen == ["stage"]
+
+
+def test_profile_restores_previous_and_decorator():
+    @profiling.profiled("twice")
+    def twice(x):
+        return 2 * x
+
+    outer = profiling.enable()
+    try:
+        with profiling.profile() as inner:
+            assert twice(2) == 4
+        assert profiling.get_profiler() is outer
+        assert [s.name for s in inner.spans] == ["twice"]
+        assert outer.spans == []
+    finally:
+        profiling.disable()
+    assert twice(3) == 6
+
+
+def test_threads_are_tagged():
+    with profiling.profile() as prof:
+        t = threading.Thread(target=lambda: profiling.span("worker").__enter__().__exit__())
+        t.start()
+        t.join()
+        with profiling.span("main"):
+            pass
+    threads = {s.name: s.thread for s in prof.spans}
+    assert threads["worker"] != threads["main"]
+
+
+def test_render_and_export_write_chrome_trace(tmp_path):
+    with profiling.profile() as prof:
+        img = patterns.get_theme("ligo")(0.2, 1.0)
+        export.save_image(img, tmp_path / "ligo.png", 0.2, 1.0)
+    names = {s.name for s in prof.spans}
+    assert {"theme.ligo", "export.save_image", "raster.encode", "raster.deflate"} <= names
+    assert np.array_equal(img, patterns.get_theme("ligo")(0.2, 1.0))
+
+    prof.write_trace(tmp_path / "trace.json")
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert len(complete) == len(prof.spans)
+    assert all({"name", "ts", "dur", "pid", "tid"} <= set(e) for e in complete)
+    assert trace["otherData"]["summary"]["theme.ligo"]["calls"] == 1
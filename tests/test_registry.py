@@ -0,0 +1,52 @@
+import subprocess
+import sys
+import types
+
+import pytest
+from quantum_staircase import patterns
+from quantum_staircase.patterns import _registry
+
+
+def test_metadata_matches_theme_modules():
+    for name in patterns.list_themes():
+        spec = patterns.get_spec(name)
+        module = _registry.theme_module(name)
+        assert spec.period == getattr(module, "PERIOD", None)
+        assert spec.symmetry == getattr(module, "SYMMETRY", None)
+
+
+def test_listing_themes_imports_nothing_heavy():
+    code = ("import sys; from quantum_staircase import patterns, utils; patterns.list_themes(); "
+            "patterns.get_spec('qec'); print(sorted({'numpy', 'matplotlib', 'shapely'} & set(sys.modules)))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+class _EntryPoint:
+    def __init__(self, name, obj):
+        self.name, self.obj = name, obj
+
+    def load(self):
+        return self.obj
+
+
+def test_entry_point_plugins(monkeypatch):
+    plugin = types.ModuleType("moire_theme", "Moire fringes.")
+    plugin.PERIOD = (3, 5)
+    plugin.generate_window = lambda *args: None
+    eps = [_EntryPoint("moire", plugin), _EntryPoint("dots", {"module": "dots_theme", "output": "vector"}),
+           _EntryPoint("ligo", None)]
+    monkeypatch.setattr(_registry, "_entry_points", lambda: eps)
+    for cached in (_registry._sources, _registry.get_spec):
+        cached.cache_clear()
+    try:
+        assert {"moire", "dots", "ligo"} <= set(patterns.list_themes())
+        assert patterns.get_period("moire") == (3, 5)
+        assert patterns.get_spec("moire").description == "Moire fringes."
+        assert patterns.get_spec("dots").output == "vector"
+        assert patterns.get_spec("ligo") is _registry.LIGO      # built-ins are not overridden
+        with pytest.raises(KeyError):
+            patterns.get_spec("nope")
+    finally:
+        for cached in (_registry._sources, _registry.get_spec):
+            cached.cache_clear()
@@ -0,0 +1,93 @@
+import gzip
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from quantum_staircase.patterns import amo, qec
+from quantum_staircase.utils.svg_export import save_svg
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _paint(root, shape):
+    img = np.full(shape, "", dtype=object)
+    for path in root.iter(f"{SVG}path"):
+        for x, y, w, h in re.findall(r"M(\d+),(\d+)h(\d+)v(\d+)h-\d+z", path.get("d")):
+            x, y, w, h = map(int, (x, y, w, h))
+            assert (img[y:y + h, x:x + w] == "").all()  # spans never overlap
+            img[y:y + h, x:x + w] = path.get("fill")
+    return img
+
+
+def test_spans_cover_every_pixel_once(tmp_path):
+    arr = amo.generate(0.09, 1)
+    out = tmp_path / "amo.svg"
+    save_svg(arr, out, 0.09, 1, levels=8, tile_px=32)
+    img = _paint(ET.parse(out).getroot(), arr.shape)
+    q = np.rint(arr * 7).astype(int)[::-1]
+    # one colour per quantized level, and every pixel painted
+    pairs = set(zip(q.ravel().tolist(), img.ravel().tolist()))
+    assert len(pairs) == len(np.unique(q))
+
+
+def test_periodic_pattern_stays_compact(tmp_path):
+    out = tmp_path / "qec.svgz"
+    save_svg(qec.generate(0.4, 1), out, 0.4, 1)
+    root = ET.parse(gzip.open(out)).getroot()
+    assert root.get("viewBox") == "0 0 400 400"
+    assert len(root) == 2 * 1  # two colours, one band
+    assert sum(len(p.get("d")) for p in root) < 400 * 400 / 20
+
+
+def test_embedded_image_tiles(tmp_path):
+    out = tmp_path / "amo.svg"
+    save_svg(amo.generate(0.05, 1), out, 0.05, 1, raster="image", tile_px=32)
+    images = list(ET.parse(out).getroot().iter(f"{SVG}image"))
+    assert len(images) == 4
+    assert images[0].get("href").startswith("data:image/png;base64,")
+
+
+def _polygons(path_d):
+    polys = []
+    for m in re.finditer(r"M(-?\d+) (-?\d+)l([-\d ]+)z", path_d):
+        start = np.array([int(m.group(1)), int(m.group(2))])
+        steps = np.array(m.group(3).split(), dtype=int).reshape(-1, 2)
+        polys.append(np.vstack([start, start + np.cumsum(steps, axis=0)]))
+    return polys
+
+
+def test_polygon_array_grouped_by_colour(tmp_path):
+    from quantum_staircase.vendor.pynrose_core import PenroseTiling
+
+    verts, thick = PenroseTiling(4).tile_array()
+    out = tmp_path / "tiles.svgz"
+    save_svg(verts, out, 1.0, 1.0, values=np.where(thick, 1.0, 0.5), precision_mm=0.1)
+    root = ET.parse(gzip.open(out)).getroot()
+    paths = list(root.iter(f"{SVG}path"))
+    assert root.get("viewBox") == "0 0 10000 10000"
+    assert len(paths) == 2                               # thick and thin: one path each
+    drawn = [p for path in paths for p in _polygons(path.get("d"))]
+    assert len(drawn) == len(verts)
+
+    lo, hi = verts.reshape(-1, 2).min(0), verts.reshape(-1, 2).max(0)
+    q = np.rint((verts - lo) * (10000 / (hi - lo).max())).astype(int)
+    q[..., 1] = 10000 - q[..., 1]
+    key = lambda a: tuple(a.ravel())
+    assert sorted(map(key, drawn)) == sorted(map(key, q))
+
+
+def test_ragged_polygons_keep_index_colours(tmp_path):
+    from matplotlib import colormaps
+
+    polys = [np.array([[0, 0], [1, 0], [0, 1]]), np.array([[1, 1], [2, 1], [2, 2], [1, 2]]),
+             np.array([[0, 2], [1, 2], [0, 3]])]
+    out = tmp_path / "ragged.svg"
+    save_svg(polys, out, 0.3, 1.0, cmap="magma", bounds=(0, 0, 3, 3), precision_mm=1)
+    fills = {}
+    for path in ET.parse(out).getroot().iter(f"{SVG}path"):
+        for poly in _polygons(path.get("d")):
+            fills[tuple(poly[0])] = path.get("fill")
+    for i, poly in enumerate(polys):
+        rgb = np.rint(np.multiply(colormaps["magma"](i / 3)[:3], 255)).astype(int)
+        start = (poly[0][0] * 100, 300 - poly[0][1] * 100)
+        assert fills[start] == "#%02x%02x%02x" % tuple(rgb)
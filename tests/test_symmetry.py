@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from quantum_staircase import patterns
+from quantum_staircase.patterns import _symmetry, amo, tensor_networks
+
+
+@pytest.mark.parametrize("px", [97, 100])
+@pytest.mark.parametrize("window", [(0, 0, None, None), (3, 60, 40, 21), (48, 50, 1, 5)])
+def test_mirrored_window_equals_direct(px, window):
+    x0, y0, w, h = window
+    w, h = w or px, h or px
+
+    def field(adx, ady):
+        return np.cos(adx) * adx + ady ** 1.5
+
+    direct = field(np.abs(np.arange(x0, x0 + w) - px / 2)[None, :], np.abs(np.arange(y0, y0 + h) - px / 2)[:, None])
+    assert np.array_equal(_symmetry.mirrored_window(field, px, x0, y0, w, h), direct)
+
+
+@pytest.mark.parametrize("module", [amo, tensor_networks])
+def test_radial_table_within_tolerance(module):
+    px = 401
+    field = _symmetry.radial_field(module.profile, module.PROFILE_CURVATURE, px)
+    offsets = np.abs(np.arange(px) - px / 2)
+    exact = module.profile(np.hypot(offsets[None, :], offsets[:, None]))
+    assert np.abs(field(offsets[None, :], offsets[:, None]) - exact).max() <= _symmetry.RADIAL_TOL
+    assert patterns.get_symmetry("amo") == "radial" and patterns.get_symmetry("ligo") is None
+
+
+@pytest.mark.parametrize("module", [amo, tensor_networks])
+def test_float32_render_memory(module, monkeypatch):
+    import tracemalloc
+
+    monkeypatch.setattr(_symmetry, "CHUNK_PIXELS", 1 << 12)     # several passes at this size
+    module.generate(0.6, 1, dtype=np.float32)                  # builds the shared radius table
+    tracemalloc.start()
+    try:
+        img = module.generate(0.6, 1, dtype=np.float32)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 1.6 * img.nbytes
+    full = module.generate(0.6, 1)
+    assert np.abs(img - full).max() < 1e-6
+    strip = module.generate_window(0.6, 1, 0, 17, 600, 90, dtype=np.float32)
+    assert np.array_equal(strip, img[17:107])
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+from shapely.ops import unary_union
+from quantum_staircase.patterns import penrose
+from quantum_staircase.utils.topology import merge_polygons
+
+
+def _square(i, j):
+    return np.array([[i, j], [i + 1, j], [i + 1, j + 1], [i, j + 1]], float)
+
+
+def _squares(n, skip=()):
+    return [_square(i, j) for i in range(n) for j in range(n) if (i, j) not in skip]
+
+
+def test_merge_matches_shapely_with_holes():
+    polys = _squares(5, skip={(2, 2)})
+    polys[3] = polys[3][::-1]   # clockwise input is reoriented
+    [(ext, holes)] = merge_polygons(polys, holes=True)
+    merged = Polygon(ext, holes)
+    assert merged.is_valid
+    assert merged.symmetric_difference(unary_union([Polygon(p) for p in polys])).area == 0
+    assert len(ext) == 20 and len(holes) == 1 and merged.area == 24
+
+
+def test_overlapping_input_is_refused():
+    with pytest.raises(ValueError):
+        merge_polygons(_squares(2) + [np.array([[0.5, 0.5], [1.5, 0.5], [1.5, 1.5], [0.5, 1.5]])])
+
+
+def test_penrose_seed_crosscheck():
+    [star] = penrose._merged_polygons(0, crosscheck=True)
+    assert len(star) == 20
+
+
+def test_holes_go_to_the_smallest_exterior():
+    def block(lo, hi):
+        return {(i, j) for i in range(lo, hi) for j in range(lo, hi)}
+
+    # a frame around an island, each with a hole; the island's hole also lies inside the frame
+    cells = block(0, 7) - block(1, 6) | block(2, 5) - {(3, 3)}
+    polys = [_square(i, j) for i, j in sorted(cells, reverse=True)]
+    result = merge_polygons(polys, holes=True)
+    areas = sorted((Polygon(ext).area, Polygon(holes[0]).area) for ext, holes in result)
+    assert areas == [(9, 1), (49, 25)]
+    merged = unary_union([Polygon(ext, holes) for ext, holes in result])
+    assert merged.symmetric_difference(unary_union([Polygon(p) for p in polys])).area == 0
+
+
+def test_nested_outline_is_refused():
+    polys = _squares(3) + [np.array([[1.25, 1.25], [1.75, 1.25], [1.75, 1.75], [1.25, 1.75]])]
+    with pytest.raises(ValueError, match="inside another"):
+        merge_polygons(polys)
+
+
+@pytest.mark.parametrize("level", [3, 6])
+def test_penrose_tilings_take_the_edge_hash_merge(level, monkeypatch):
+    def refuse(verts):
+        raise AssertionError("fell back to shapely")
+    [outline] = penrose._merged_polygons(level, crosscheck=True)
+    monkeypatch.setattr(penrose, "_shapely_union", refuse)
+    assert np.array_equal(penrose._merged_polygons(level)[0], outline)
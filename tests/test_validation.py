@@ -1,7 +1,82 @@
 import numpy as np
-from quantum_staircase.utils.validation import validate_polygons
+import pytest
+from quantum_staircase.utils.validation import find_overlaps, validate_polygons
 from shapely.geometry import Polygon
 def test_simple_square():
     polys = [Polygon([(0,0),(1,0),(1,1),(0,1)])]
     ok, _ = validate_polygons([np.array(p.exterior.coords[:-1]) for p in polys])
     assert ok
+
+
+def _old_overlap(polys):
+    from shapely.ops import unary_union
+    cleaned = [Polygon(p).buffer(0) for p in polys]
+    return sum(p.area for p in cleaned) - unary_union(cleaned).area
+
+
+def test_overlaps_match_global_union():
+    rng = np.random.default_rng(0)
+    base = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], float)
+    polys = [base * rng.uniform(0.2, 1) + rng.uniform(0, 4, 2) for _ in range(60)]
+    report = find_overlaps(polys)
+    assert np.isclose(report.overlap_area, _old_overlap(polys))
+    for i, j in report.pairs:
+        assert Polygon(polys[i]).intersection(Polygon(polys[j])).area > 0
+    early = find_overlaps(polys, tol=1e-3, early_exit=True, workers=2)
+    assert not early.ok and 1e-3 < early.overlap_area <= report.overlap_area + 1e-12
+
+
+def test_touching_squares_pass():
+    squares = np.array([[[i, 0], [i + 1, 0], [i + 1, 1], [i, 1]] for i in range(5)], float)
+    report = find_overlaps(squares)
+    assert report.ok and report.pairs == [] and report.n_polygons == 5
+
+
+@pytest.mark.parametrize("per_edge", [1, 3])     # 3: too many vertices for the NumPy path
+def test_rounding_contacts_are_not_overlaps(per_edge):
+    n, turn = 30, 0.1234
+    rot = np.array([[np.cos(turn), -np.sin(turn)], [np.sin(turn), np.cos(turn)]])
+    t = np.arange(per_edge) / per_edge
+    corners = np.array([[-.5, -.5], [.5, -.5], [.5, .5], [-.5, .5], [-.5, -.5]])
+    ring = np.concatenate([a + t[:, None] * (b - a) for a, b in zip(corners[:-1], corners[1:])])
+    centres = np.stack(np.meshgrid(np.arange(n), np.arange(n)), -1).reshape(-1, 2) + 0.5
+    # each square placed on its own: shared corners agree only to rounding
+    grid = centres[:, None] @ rot.T + ring @ rot.T
+    for polys in (grid, list(grid)):
+        report = find_overlaps(polys)
+        assert report.ok and report.pairs == [] and report.overlap_area == 0
+    grid[7] += 0.05
+    report = find_overlaps(grid)
+    assert not report.ok and all(7 in pair for pair in report.pairs)
+    assert np.isclose(report.overlap_area, _old_overlap(grid))
+
+
+def _three_child_rhombs(level):
+    """The Penrose tiler's former rhomb split: collinear corners, spikes and real overlaps."""
+    a, ang = 2 / (1 + 5 ** 0.5), np.arange(10)[:, None] * np.pi / 5
+    c, s, c5, s5 = np.cos(ang), np.sin(ang), np.cos(np.pi / 5), np.sin(np.pi / 5)
+    rot = lambda x, y: np.hstack([c * x - s * y, s * x + c * y])
+    verts = np.stack([rot(0, 0), rot(1, 0), rot(1 + c5, s5), rot(c5, s5)], axis=1)
+    thick = np.ones(10, dtype=bool)
+    for _ in range(level):
+        A, B, C, D = verts.transpose(1, 0, 2)
+        k = thick[:, None]
+        X = np.where(k, A + a * (B - A), B + a * (A - B))
+        DA, BC = D + a * (A - D), B + a * (C - B)
+        kids = [np.where(k[:, None], np.stack(t, 1), np.stack(f, 1)) for t, f in (
+            ((A, X, DA, D), (X, A, DA, D)),
+            ((X, B, BC, DA), (X, BC, C, DA)),
+            ((DA, BC, C, D), (X, B, BC, A)),
+        )]
+        verts = np.stack(kids, 1).reshape(-1, 4, 2)
+        thick = np.stack([thick, ~thick, thick], 1).ravel()
+    return verts
+
+
+def test_spike_rings_match_global_union():
+    polys = _three_child_rhombs(4)
+    report = find_overlaps(polys)
+    assert np.isclose(report.overlap_area, _old_overlap(polys))
+    for i, j in report.pairs:
+        a, b = Polygon(polys[i]).buffer(0), Polygon(polys[j]).buffer(0)
+        assert a.area + b.area - a.union(b).area > 1e-10
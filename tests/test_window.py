@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from quantum_staircase import patterns
+
+
+@pytest.mark.parametrize("theme", patterns.list_themes())
+def test_window_matches_full_render(theme):
+    full = patterns.get_theme(theme)(0.137, 1)
+    win = patterns.get_window(theme)(0.137, 1, 30, 11, 57, 80)
+    assert np.array_equal(win, full[11:91, 30:87])
+
+
+@pytest.mark.parametrize("theme", patterns.list_themes())
+def test_render_tiled_matches_full_render(theme):
+    full = patterns.get_theme(theme)(0.1, 1)
+    assert np.array_equal(patterns.render_tiled(theme, 0.1, 1, tile_px=32), full)
+
+
+def test_window_outside_panel():
+    with pytest.raises(ValueError):
+        patterns.get_window("ligo")(0.1, 1, 90, 0, 20, 10)
+
+
+@pytest.mark.parametrize("backend", patterns.BACKENDS)
+def test_parallel_render_matches_serial(backend):
+    full = patterns.get_theme("amo")(0.1, 1)
+    assert np.array_equal(patterns.render_tiled("amo", 0.1, 1, 24, workers=3, backend=backend), full)
+    strips = patterns.iter_strips("amo", 0.1, 1, rows=16, workers=3, backend=backend)
+    assert np.array_equal(np.concatenate(list(strips)), full)
+
+
+@pytest.mark.parametrize("target", ["npy", "view", "array"])
+def test_process_fill_writes_through(target, tmp_path):
+    full = patterns.get_theme("amo")(0.1, 1)
+    # the .npy header puts the panel at a file offset; "view" is a row range of a taller file
+    rows, shape = (slice(17, 117), (130, 100)) if target == "view" else (slice(None), full.shape)
+    if target == "array":
+        out = np.zeros_like(full)
+    else:
+        out = np.lib.format.open_memmap(tmp_path / "panel.npy", "w+", full.dtype, shape)[rows]
+    assert patterns.render_tiled("amo", 0.1, 1, 24, out=out, workers=2, backend="process") is out
+    assert np.array_equal(out, full)
+    if target != "array":
+        assert np.array_equal(np.load(tmp_path / "panel.npy")[rows], full)
+
+
+@pytest.mark.parametrize("theme", patterns.list_themes())
+def test_float32_window_in_place(theme):
+    full = patterns.get_theme(theme)(0.137, 1)
+    buf = np.empty((80, 57), np.float32)
+    assert patterns.get_window(theme)(0.137, 1, 30, 11, 57, 80, out=buf) is buf
+    assert np.allclose(buf, full[11:91, 30:87], atol=1e-5)
+    assert -1e-6 <= full.min() and full.max() <= 1 + 1e-6
+
+
+@pytest.mark.parametrize("theme", ["qec", "condensed_matter"])
+def test_periodic_theme_is_lazy(theme):
+    big = patterns.get_theme(theme)(100, 1, lazy=True)    # 100 000² pixels, one unit cell in memory
+    assert isinstance(big, patterns.TiledArray) and big.cell.shape == patterns.get_period(theme)
+    win = patterns.get_window(theme)(0.137, 1, 30, 11, 57, 80, lazy=True)
+    assert np.array_equal(big[11:91, 30:87], np.asarray(win))
+    assert np.array_equal(np.asarray(0.5 * win + 1), 0.5 * np.asarray(win) + 1)
+    assert win.min() == 0 and win.max() == 1
+
+
+@pytest.mark.parametrize("theme", ["qec", "condensed_matter"])
+def test_periodic_theme_returns_ndarray_by_default(theme):
+    full = patterns.get_theme(theme)(0.137, 1)
+    module = patterns._registry.theme_module(theme)
+    assert type(full) is np.ndarray and type(module.generate(0.137, 1)) is np.ndarray
+    win = patterns.get_window(theme)(0.137, 1, 30, 11, 57, 80)
+    assert type(win) is np.ndarray and np.array_equal(win, full[11:91, 30:87])
+    lazy = patterns.get_theme(theme)(0.137, 1, lazy=True)
+    assert np.array_equal(np.asarray(lazy), full)
+
+
+def test_tiled_array_falls_back_to_ndarray():
+    lazy = patterns.get_theme("qec")(0.137, 1, lazy=True)
+    full = patterns.get_theme("qec")(0.137, 1)
+    assert lazy.mean() == full.mean()
+    assert lazy.astype(np.uint8).dtype == np.uint8
+    assert np.array_equal(lazy.T, full.T) and np.array_equal(lazy.copy(), full)
+    assert np.array_equal(lazy.ravel(), full.ravel()) and lazy.reshape(-1, 1).shape == (full.size, 1)
+    mask = full > 0.5
+    assert np.array_equal(lazy[mask], full[mask])
+    rows, cols = [3, 50, 7], [1, 2, 90]
+    assert np.array_equal(lazy[rows, cols], full[rows, cols])     # paired, as NumPy does
+    assert np.array_equal(lazy[None, 5], full[None, 5])
+    assert np.array_equal(lazy[-3:, ..., ::7], full[-3:, ..., ::7])
+    with pytest.raises(AttributeError):
+        lazy.no_such_attribute
+
+
+def test_cli_literals_match_modules():
+    from quantum_staircase import cli
+    from quantum_staircase.utils import cache, raster_export
+    assert cli._MODES == raster_export.MODES and cli._BACKENDS == patterns.BACKENDS
+    assert cli._DEFAULT_CACHE_MB << 20 == cache.DEFAULT_MAX_BYTES